@@ -1,19 +1,21 @@
 # Data
 import numpy as np
 import pandas as pd
-import yfinance as yf
 
 # Plotting
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+# Storage
+from LocalStorage.candle_store import CandleStore
+
 
 class Correlation:
     def __init__(self) -> None:
-        pass
+        self.candle_store = CandleStore()
 
     def create_matrix(self, tickers: list):
-        data = yf.download(tickers)
+        data = self.candle_store.download(tickers)
         close_prices = data["Close"]
         matrix = close_prices.corr()
         return matrix
@@ -3,13 +3,22 @@ import pandas as pd
 import yfinance as yf
 import matplotlib.pyplot as plt
 
+# Storage
+from LocalStorage.candle_store import CandleStore
+
+# Data providers
+from DataProviders.fundamentals import get_fundamentals
+
 
 class StockCharts:
     def __init__(self) -> None:
-        pass
+        self.candle_store = CandleStore()
+        self.fundamentals = get_fundamentals()
 
     def compare_candles(self, tickers: list, interval: str = "1d", period: str = "1y"):
-        candles = yf.download(tickers, interval=interval, period=period)["Close"]
+        candles = self.candle_store.download(tickers, interval=interval, period=period)[
+            "Close"
+        ]
         data = pd.DataFrame()
         for t in tickers:
             values = candles[t]
@@ -23,34 +32,12 @@ class StockCharts:
     def compare_growth(
         self, tickers: list, revenue: bool = True, earnings: bool = True
     ):
-        data = {"Ticker": tickers, "MCAP": []}
-        for t in tickers:
-            obj = yf.Ticker(t)
-            info = obj.info
-            mcap = info["marketCap"]
-            try:
-                r_growth = info["revenueGrowth"] * 100
-            except KeyError:
-                r_growth = np.nan
-            try:
-                e_growth = info["earningsGrowth"] * 100
-            except KeyError:
-                e_growth = np.nan
-            if revenue:
-                try:
-                    data["Revenue"].append(r_growth)
-                except KeyError:
-                    data["Revenue"] = [r_growth]
-            if earnings:
-                try:
-                    data["Earnings"].append(e_growth)
-                except KeyError:
-                    data["Earnings"] = [e_growth]
-            data["MCAP"].append(mcap)
-
-        df = pd.DataFrame(data).set_index("Ticker")
-        df.sort_values("MCAP", axis=0, inplace=True, ascending=False)
-        df.drop("MCAP", axis=1, inplace=True)
+        columns = {"revenueGrowth": "Revenue", "earningsGrowth": "Earnings"}
+        selected = [revenue, earnings]
+        fields = [f for f, keep in zip(columns, selected) if keep]
+        df = self.fundamentals.get_frame(tickers, ["marketCap", *fields])
+        df = self._by_market_cap(df).rename(columns=columns)
+        df = df * 100
         self.plot_dataframe(
             df,
             "Growth Comparison",
@@ -89,65 +76,20 @@ class StockCharts:
         pfcf : bool, optional
             Price-to-Free-Cash-Flow, by default True
         """
-        data = {
-            "Ticker": tickers,
-            "MCAP": [],
+        columns = {
+            "priceToSalesTrailing12Months": "P/S",
+            "trailingPE": "P/E",
+            "forwardPE": "Forward P/E",
+            "trailingPegRatio": "PEG",
+            "priceToBook": "P/B",
+            "freeCashflow": "P/FCF",
         }
-        for t in tickers:
-            obj = yf.Ticker(t)
-            info = obj.info
-            mcap = info["marketCap"]
-            if ps:
-                ps_val = info["priceToSalesTrailing12Months"]
-                try:
-                    data["P/S"].append(ps_val)
-                except KeyError:
-                    data["P/S"] = [ps_val]
-            if pe:
-                try:
-                    pe_val = info["trailingPE"]
-                except KeyError:
-                    pe_val = np.nan
-                try:
-                    data["P/E"].append(pe_val)
-                except KeyError:
-                    data["P/E"] = [pe_val]
-
-            if forward_pe:
-                try:
-                    fpe = info["forwardPE"]
-                except KeyError:
-                    fpe = np.nan
-                try:
-                    data["Forward P/E"].append(fpe)
-                except KeyError:
-                    data["Forward P/E"] = [fpe]
-            if peg:
-                peg_val = info["trailingPegRatio"]
-                try:
-                    data["PEG"].append(peg_val)
-                except KeyError:
-                    data["PEG"] = [peg_val]
-            if pb:
-                try:
-                    pb_val = info["priceToBook"]
-                except KeyError:
-                    pb_val = np.nan
-                try:
-                    data["P/B"].append(pb_val)
-                except KeyError:
-                    data["P/B"] = [pb_val]
-            if pfcf:
-                pfcf_val = mcap / info["freeCashflow"]
-                try:
-                    data["P/FCF"].append(pfcf_val)
-                except KeyError:
-                    data["P/FCF"] = [pfcf_val]
-            data["MCAP"].append(mcap)
-
-        df = pd.DataFrame(data).set_index("Ticker")
-        df.sort_values("MCAP", axis=0, inplace=True, ascending=False)
-        df.drop("MCAP", axis=1, inplace=True)
+        selected = [ps, pe, forward_pe, peg, pb, pfcf]
+        fields = [f for f, keep in zip(columns, selected) if keep]
+        df = self.fundamentals.get_frame(tickers, ["marketCap", *fields])
+        if pfcf:
+            df["freeCashflow"] = df["marketCap"] / df["freeCashflow"]
+        df = self._by_market_cap(df).rename(columns=columns)
         self.plot_dataframe(
             df,
             "Comparison of Financial Ratios",
@@ -157,28 +99,14 @@ class StockCharts:
         )
 
     def compare_margins(self, tickers: list):
-        data = {
-            "Ticker": tickers,
-            "Gross Margin": [],
-            "Operating Margin": [],
-            "Net Margin": [],
-            "MCAP": [],
+        columns = {
+            "grossMargins": "Gross Margin",
+            "operatingMargins": "Operating Margin",
+            "profitMargins": "Net Margin",
         }
-        for t in tickers:
-            obj = yf.Ticker(t)
-            info = obj.info
-            mcap = info["marketCap"]
-            gross = info["grossMargins"] * 100
-            operating = info["operatingMargins"] * 100
-            net = info["profitMargins"] * 100
-            data["Gross Margin"].append(gross)
-            data["Operating Margin"].append(operating)
-            data["Net Margin"].append(net)
-            data["MCAP"].append(mcap)
-        # Create a DataFrame for better handling
-        df = pd.DataFrame(data).set_index("Ticker")
-        df.sort_values("MCAP", axis=0, inplace=True, ascending=False)
-        df.drop("MCAP", axis=1, inplace=True)
+        df = self.fundamentals.get_frame(tickers, ["marketCap", *columns])
+        df = self._by_market_cap(df).rename(columns=columns)
+        df = df * 100
         self.plot_dataframe(
             df,
             "Comparison of Gross and Operating Margins",
@@ -189,7 +117,7 @@ class StockCharts:
         # Set the index to Ticker for easier plotting
 
     def plot_dividends(self, ticker: str, freq: int = 4):
-        candles = yf.download(ticker.upper(), multi_level_index=False)
+        candles = self.candle_store.download(ticker.upper(), multi_level_index=False)
         ticker = yf.Ticker(ticker.upper())
         dividends = ticker.history(period="max")["Dividends"]
         dividends = dividends[dividends > 0]
@@ -229,43 +157,15 @@ class StockCharts:
         roe: bool = True,
         current_ratio: bool = True,
     ):
-        data = {"Ticker": tickers, "MCAP": []}
-        for t in tickers:
-            obj = yf.Ticker(t)
-            info = obj.info
-            mcap = info["marketCap"]
-
-            if roa:
-                try:
-                    roa_val = info["returnOnAssets"]
-                except KeyError:
-                    roa_val = np.nan
-                try:
-                    data["ROA"].append(roa_val)
-                except KeyError:
-                    data["ROA"] = [roa_val]
-            if roe:
-                try:
-                    roe_val = info["returnOnEquity"]
-                except KeyError:
-                    roe_val = np.nan
-                try:
-                    data["ROE"].append(roe_val)
-                except KeyError:
-                    data["ROE"] = [roe_val]
-            if current_ratio:
-                try:
-                    c_val = info["currentRatio"]
-                except KeyError:
-                    c_val = np.nan
-                try:
-                    data["Current Ratio"].append(c_val)
-                except KeyError:
-                    data["Current Ratio"] = [c_val]
-            data["MCAP"].append(mcap)
-        df = pd.DataFrame(data).set_index("Ticker")
-        df.sort_values("MCAP", axis=0, inplace=True, ascending=False)
-        df.drop("MCAP", axis=1, inplace=True)
+        columns = {
+            "returnOnAssets": "ROA",
+            "returnOnEquity": "ROE",
+            "currentRatio": "Current Ratio",
+        }
+        selected = [roa, roe, current_ratio]
+        fields = [f for f, keep in zip(columns, selected) if keep]
+        df = self.fundamentals.get_frame(tickers, ["marketCap", *fields])
+        df = self._by_market_cap(df).rename(columns=columns)
         self.plot_dataframe(
             df,
             "Financial Health Comparison",
@@ -274,6 +174,13 @@ class StockCharts:
             "Health Metrics",
         )
 
+    def _by_market_cap(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Sort fundamentals by market cap (largest first) and drop the 'marketCap' column.
+        """
+        df = df.sort_values("marketCap", ascending=False)
+        return df.drop(columns="marketCap")
+
     def plot_dataframe(
         self,
         df: pd.DataFrame,
@@ -13,6 +13,12 @@ import mplfinance as mpf
 
 import datetime as dt
 
+# Storage
+from LocalStorage.candle_store import CandleStore
+
+# Data providers
+from DataProviders.rate_limiter import get_limiter
+from DataProviders.provider import get_provider
 
 free_exchanges = ["hyperliquid", "paradex", "vertex"]
 
@@ -23,6 +29,9 @@ class CentralizedExchange:
         self.exchange = getattr(ccxt, name)()
         self.stable_coins = ["USD", "USDC", "USDT", "DAI"]
         self.ta = TechnicalAnalysis()
+        self.candle_store = CandleStore(source=name)
+        # Starts at the exchange's documented rate, 'rateLimit' is milliseconds between requests.
+        self.limiter = get_limiter(name, rate=1000 / self.exchange.rateLimit)
 
         self.technical_indicators = {
             "rsi": {"oversold": 30, "overbought": 70},
@@ -137,7 +146,7 @@ class CentralizedExchange:
             else:
                 symbol = f"{ticker.upper()}/{market.upper()}"
             try:
-                ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+                ohlcv = self._fetch_ohlcv(symbol, timeframe, limit)
                 return ohlcv
             except BadSymbol:
                 index += 1
@@ -149,6 +158,50 @@ class CentralizedExchange:
             except NotSupported:
                 print(f"Ticker: {ticker}")
 
+    def _fetch_ohlcv(self, symbol: str, timeframe: str, limit: int) -> list:
+        """
+        Fetch the last 'limit' candles of 'symbol' through the candle store.
+        When the stored candles cover the whole window up to their last bar, only the bars since that one are requested.
+        """
+        bar_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        window_start = self.exchange.milliseconds() - limit * bar_ms
+        stored = self.candle_store.read(
+            symbol, timeframe, start=pd.Timestamp(window_start, unit="ms", tz="UTC")
+        )
+        # First bar of the window, stored bars only help when their covered range starts at or before it.
+        first_bar = pd.Timestamp(-(-window_start // bar_ms) * bar_ms, unit="ms")
+        since = None
+        if not stored.empty and self.candle_store.is_covered(
+            symbol, timeframe, first_bar, stored.index[-1]
+        ):
+            # The last stored bar is fetched again since it may have been incomplete.
+            since = int(stored.index[-1].value // 1_000_000)
+        ohlcv = get_provider().fetch(
+            self.name,
+            ("fetch_ohlcv", symbol, timeframe, since, limit),
+            self.exchange.fetch_ohlcv,
+            symbol,
+            timeframe,
+            since=since,
+            limit=limit,
+        )
+        if ohlcv != []:
+            new = pd.DataFrame(
+                ohlcv,
+                columns=["timestamp", "open", "high", "low", "close", "volume_qty"],
+            )
+            new.index = pd.to_datetime(new.pop("timestamp"), unit="ms", utc=True)
+            self.candle_store.write(
+                symbol, timeframe, new, start=new.index[0], end=new.index[-1]
+            )
+            stored = pd.concat([stored, new])
+            stored = stored[~stored.index.duplicated(keep="last")]
+        stored = stored.iloc[-limit:]
+        timestamps = stored.index.as_unit("ms").asi8
+        return [
+            [int(t), *row] for t, row in zip(timestamps, stored.to_numpy().tolist())
+        ]
+
     def _apply_indicators(self, df: pd.DataFrame, indicators: list):
 
         if "rsi" in indicators:
@@ -214,7 +267,9 @@ class CentralizedExchange:
     """
 
     def fetch_markets(self):
-        markets = self.exchange.fetch_markets()
+        markets = get_provider().fetch(
+            self.name, ("fetch_markets",), self.exchange.fetch_markets
+        )
         data = {
             "base": [],
             "quote": [],
@@ -0,0 +1,130 @@
+import time
+import threading
+from concurrent.futures import Future
+
+# Data
+import pandas as pd
+import yfinance as yf
+
+# Data providers
+from DataProviders.provider import get_provider
+
+
+class RequestCoalescer:
+    def __init__(self) -> None:
+        """
+        Share in-flight work between threads. The first caller of a key owns the work,
+        later callers of the same key wait for the owner's result instead of repeating it.
+        """
+        self.lock = threading.Lock()
+        self.in_flight = {}
+
+    def run(self, key, fn):
+        """
+        Call 'fn()' unless a call for 'key' is already running, in which case wait for and return its result.
+        """
+        owned, pending = self.claim([key])
+        if owned == []:
+            return pending[key].result()
+        try:
+            result = fn()
+        except Exception as e:
+            self.release(owned, error=e)
+            raise
+        self.release(owned, result)
+        return result
+
+    def claim(self, keys: list) -> tuple:
+        """
+        Claim the keys nobody is working on.
+
+        Returns
+        -------
+        tuple
+            (owned, pending): the keys claimed by the caller, which must be passed to 'release()',
+            and a dict of key -> Future for the keys owned by another caller.
+        """
+        owned, pending = [], {}
+        with self.lock:
+            for key in keys:
+                if key in self.in_flight:
+                    pending[key] = self.in_flight[key]
+                elif key not in owned:
+                    self.in_flight[key] = Future()
+                    owned.append(key)
+        return owned, pending
+
+    def release(self, keys: list, result=None, error: Exception = None):
+        with self.lock:
+            futures = [self.in_flight.pop(key) for key in keys]
+        for future in futures:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+class DownloadBatcher:
+    def __init__(self, window: float = 0.05) -> None:
+        """
+        Merge concurrent 'yf.download()' calls with the same arguments into a single request.
+
+        The first call of a batch waits 'window' seconds for other calls to join, then downloads the union
+        of their tickers. Every caller receives the columns of the tickers it asked for.
+
+        Parameters
+        ----------
+        window : float, optional
+            Seconds a batch stays open, by default 0.05
+        """
+        self.window = window
+        self.lock = threading.Lock()
+        self.batches = {}
+        self.stats = {"calls": 0, "downloads": 0, "tickers": 0}
+
+    def download(self, tickers: list, **kwargs) -> pd.DataFrame:
+        """
+        Same as 'yf.download(tickers, multi_level_index=True, progress=False, **kwargs)'.
+        """
+        key = tuple(sorted((k, str(v)) for k, v in kwargs.items()))
+        with self.lock:
+            self.stats["calls"] += 1
+            batch = self.batches.get(key)
+            leader = batch is None
+            if leader:
+                batch = {"tickers": {}, "result": Future()}
+                self.batches[key] = batch
+            batch["tickers"].update(dict.fromkeys(tickers))
+
+        if leader:
+            time.sleep(self.window)
+            with self.lock:
+                # Calls arriving from now on start a new batch.
+                del self.batches[key]
+                # Sorted, so the same set of tickers gives the same request (and fixture key) in any arrival order.
+                batch_tickers = sorted(batch["tickers"])
+                self.stats["downloads"] += 1
+                self.stats["tickers"] += len(batch_tickers)
+            try:
+                data = get_provider().fetch(
+                    "yahoo",
+                    ("download", batch_tickers, kwargs),
+                    yf.download,
+                    batch_tickers,
+                    multi_level_index=True,
+                    progress=False,
+                    **kwargs,
+                )
+                batch["result"].set_result(data)
+            except Exception as e:
+                batch["result"].set_exception(e)
+
+        data = batch["result"].result()
+        if data.empty or not isinstance(data.columns, pd.MultiIndex):
+            return data
+        return data.loc[:, data.columns.get_level_values("Ticker").isin(tickers)]
+
+
+# Shared by every 'CandleStore', so separate consumers in one process share their downloads.
+coalescer = RequestCoalescer()
+batcher = DownloadBatcher()
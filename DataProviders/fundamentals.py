@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Data
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+# Data providers
+from DataProviders.coalescing import RequestCoalescer
+from DataProviders.provider import get_provider
+
+fundamentals_cache = "./LocalStorage/Cache/Fundamentals"
+# Info requests go through their own limiter, so their rate can be tuned without touching the other Yahoo requests.
+info_source = "yahoo_info"
+
+
+class Fundamentals:
+    def __init__(
+        self,
+        ttl: float = 12 * 60 * 60,
+        cache_dir: str = fundamentals_cache,
+        max_workers: int = 8,
+    ) -> None:
+        """
+        'yf.Ticker(t).info' dicts memoized in memory and on disk (one JSON file per ticker).
+        Missing or expired tickers are fetched concurrently through a bounded thread pool, and a ticker
+        already being fetched by another caller is awaited instead of fetched twice.
+
+        Parameters
+        ----------
+        ttl : float, optional
+            Seconds a fetched info dict stays valid, by default 12 hours
+        cache_dir : str, optional
+            Directory of the JSON files shared by every process, by default 'fundamentals_cache'
+        max_workers : int, optional
+            Maximum number of concurrent requests, by default 8
+        """
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.infos = {}
+        self.lock = threading.Lock()
+        self.coalescer = RequestCoalescer()
+
+    def get_info(self, ticker: str) -> dict:
+        return self.get_infos([ticker])[ticker.upper()]
+
+    def get_infos(self, tickers: list) -> dict:
+        """
+        Info dict of every ticker, empty for tickers that couldn't be fetched.
+
+        Returns
+        -------
+        dict
+            Ticker (upper case) -> info dict.
+        """
+        tickers = list(dict.fromkeys(t.upper() for t in tickers))
+        infos = {}
+        missing = []
+        for t in tickers:
+            info = self._get_cached(t)
+            if info is None:
+                missing.append(t)
+            else:
+                infos[t] = info
+        if missing != []:
+            workers = min(self.max_workers, len(missing))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                fetched = executor.map(
+                    lambda t: self.coalescer.run(t, lambda: self._fetch(t)), missing
+                )
+                infos.update(zip(missing, fetched))
+        return {t: infos[t] for t in tickers}
+
+    def get_frame(self, tickers: list, fields: list) -> pd.DataFrame:
+        """
+        One row per ticker (index 'Ticker') and one column per info field, NaN where a field is missing.
+        """
+        infos = self.get_infos(tickers)
+        rows = [[infos[t.upper()].get(f) for f in fields] for t in tickers]
+        frame = pd.DataFrame(
+            rows, index=pd.Index(tickers, name="Ticker"), columns=fields
+        )
+        # Yahoo reports some missing values as None, which would keep a column as objects.
+        return frame.fillna(np.nan).infer_objects()
+
+    def invalidate(self, ticker: str = None):
+        """
+        Forget the in-memory info of 'ticker' (every ticker when None), so it is read again from disk or Yahoo.
+        """
+        with self.lock:
+            if ticker is None:
+                self.infos.clear()
+            else:
+                self.infos.pop(ticker.upper(), None)
+
+    def _get_cached(self, ticker: str):
+        with self.lock:
+            entry = self.infos.get(ticker)
+        if entry is not None and self._is_fresh(entry["fetched_at"]):
+            return entry["info"]
+        entry = self._read_cache(ticker)
+        if entry is not None and self._is_fresh(entry["fetched_at"]):
+            with self.lock:
+                self.infos[ticker] = entry
+            return entry["info"]
+        return None
+
+    def _fetch(self, ticker: str) -> dict:
+        try:
+            info = get_provider().fetch(
+                info_source, ("info", ticker), lambda: yf.Ticker(ticker).info
+            )
+        except Exception as e:
+            # A stale info dict beats no info when the request fails.
+            cached = self._read_cache(ticker)
+            print(f"[Fundamentals] {ticker}: {e}")
+            return {} if cached is None else cached["info"]
+        entry = {"info": info, "fetched_at": time.time()}
+        with self.lock:
+            self.infos[ticker] = entry
+        self._write_cache(ticker, entry)
+        return info
+
+    def _is_fresh(self, fetched_at: float) -> bool:
+        return time.time() - fetched_at < self.ttl
+
+    def _get_path(self, ticker: str) -> str:
+        return os.path.join(self.cache_dir, f"{ticker.replace('/', '-')}.json")
+
+    def _read_cache(self, ticker: str):
+        try:
+            with open(self._get_path(ticker), "r") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_cache(self, ticker: str, entry: dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._get_path(ticker)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(entry, file, default=str)
+        os.replace(temp_path, path)
+
+
+_fundamentals = None
+_fundamentals_lock = threading.Lock()
+
+
+def get_fundamentals(ttl: float = None) -> Fundamentals:
+    """
+    Process-wide fundamentals service. Passing 'ttl' updates its TTL.
+    """
+    global _fundamentals
+    with _fundamentals_lock:
+        if _fundamentals is None:
+            _fundamentals = Fundamentals()
+    if ttl is not None:
+        _fundamentals.ttl = ttl
+    return _fundamentals
@@ -0,0 +1,207 @@
+import os
+import time
+import pickle
+import random
+import hashlib
+import threading
+
+# Data providers
+from DataProviders.rate_limiter import get_limiter
+
+fixture_storage = "./LocalStorage/Fixtures"
+
+
+class FixtureNotFoundError(KeyError):
+    pass
+
+
+def get_request_key(source: str, request) -> str:
+    """
+    Stable file name of a request. 'request' is any combination of tuples, lists, dicts and values with a stable repr.
+    """
+    text = repr((source, _normalize(request)))
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _normalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        values = [_normalize(v) for v in value]
+        return tuple(sorted(values, key=repr) if isinstance(value, set) else values)
+    return value
+
+
+class LiveProvider:
+    def __init__(self) -> None:
+        """
+        Calls the live services, through the rate limiter of each source.
+        """
+        self.stats = {"calls": 0}
+
+    def fetch(self, source: str, request, fn, *args, **kwargs):
+        """
+        Return 'fn(*args, **kwargs)'.
+
+        Parameters
+        ----------
+        source : str
+            Provider of the data ("yahoo", "finviz" or the ccxt exchange name), also the name of its rate limiter.
+        request : hashable
+            Description of the request, e.g. ("info", "AAPL"). Identifies the response in fixtures.
+        fn : callable
+            Performs the request.
+        """
+        self.stats["calls"] += 1
+        return get_limiter(source).call(fn, *args, **kwargs)
+
+
+class RecordingProvider(LiveProvider):
+    def __init__(self, fixture_dir: str = fixture_storage) -> None:
+        """
+        Calls the live services and records every response (or exception) to 'fixture_dir/source/key.pkl'.
+        Repeated requests are appended in order, so a replay returns the same sequence.
+
+        Parameters
+        ----------
+        fixture_dir : str, optional
+            Directory of the fixtures, by default 'fixture_storage'
+        """
+        super().__init__()
+        self.fixture_dir = fixture_dir
+        self.lock = threading.Lock()
+        self.recorded = set()
+
+    def fetch(self, source: str, request, fn, *args, **kwargs):
+        try:
+            result = super().fetch(source, request, fn, *args, **kwargs)
+        except Exception as e:
+            self._record(source, request, ("error", e))
+            raise
+        self._record(source, request, ("result", result))
+        return result
+
+    def _record(self, source: str, request, response: tuple):
+        key = get_request_key(source, request)
+        path = os.path.join(self.fixture_dir, source, f"{key}.pkl")
+        with self.lock:
+            # A new recording replaces the fixture, later responses of the same request are appended to it.
+            mode = "ab" if path in self.recorded else "wb"
+            self.recorded.add(path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, mode) as file:
+                pickle.dump((request, response), file)
+
+
+class ReplayProvider:
+    def __init__(
+        self,
+        fixture_dir: str = fixture_storage,
+        latency=0.0,
+        jitter: float = 0.0,
+        seed: int = None,
+    ) -> None:
+        """
+        Serves responses recorded by a RecordingProvider without touching the network.
+
+        Parameters
+        ----------
+        fixture_dir : str, optional
+            Directory of the fixtures, by default 'fixture_storage'
+        latency : float or dict, optional
+            Seconds added to every response, or source -> seconds, by default 0.0
+        jitter : float, optional
+            Maximum random seconds added on top of 'latency', by default 0.0
+        seed : int, optional
+            Seed of the jitter, by default None
+        """
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.fixtures = {}
+        self.positions = {}
+        self.stats = {"calls": 0, "missing": 0, "latency_seconds": 0.0}
+
+    def fetch(self, source: str, request, fn=None, *args, **kwargs):
+        """
+        Recorded response of 'request', 'fn' is never called.
+        Requests recorded several times return their responses in order, then the last one again.
+        """
+        key = get_request_key(source, request)
+        responses = self._get_responses(source, key)
+        with self.lock:
+            self.stats["calls"] += 1
+            if responses is None:
+                self.stats["missing"] += 1
+            else:
+                position = self.positions.get(key, 0)
+                self.positions[key] = position + 1
+            delay = self._get_latency(source)
+            self.stats["latency_seconds"] += delay
+        if delay > 0:
+            time.sleep(delay)
+        if responses is None:
+            raise FixtureNotFoundError(f"No fixture for {source} request {request!r}")
+        kind, value = responses[min(position, len(responses) - 1)]
+        if kind == "error":
+            raise value
+        return value
+
+    def reset(self):
+        """
+        Restart every recorded sequence from its first response.
+        """
+        with self.lock:
+            self.positions.clear()
+
+    def _get_responses(self, source: str, key: str):
+        if key not in self.fixtures:
+            path = os.path.join(self.fixture_dir, source, f"{key}.pkl")
+            try:
+                responses = self._read_fixture(path)
+            except FileNotFoundError:
+                responses = None
+            with self.lock:
+                self.fixtures[key] = responses
+        return self.fixtures[key]
+
+    def _read_fixture(self, path: str) -> list:
+        """
+        Responses of a fixture file, one pickled (request, response) record after the other.
+        """
+        responses = []
+        with open(path, "rb") as file:
+            while True:
+                try:
+                    responses.append(pickle.load(file)[1])
+                except EOFError:
+                    return responses
+
+    def _get_latency(self, source: str) -> float:
+        latency = self.latency
+        if isinstance(latency, dict):
+            latency = latency.get(source, latency.get("default", 0.0))
+        if self.jitter > 0:
+            latency += self.random.uniform(0, self.jitter)
+        return latency
+
+
+_provider = LiveProvider()
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    return _provider
+
+
+def set_provider(provider):
+    """
+    Route every market data request of the process through 'provider'. Returns the previous provider.
+    """
+    global _provider
+    with _provider_lock:
+        previous = _provider
+        _provider = provider
+    return previous
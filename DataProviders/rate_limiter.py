@@ -0,0 +1,203 @@
+import time
+import threading
+
+# Exceptions raised when a provider throttles or is temporarily unavailable (ccxt, yfinance).
+THROTTLE_ERRORS = {
+    "RateLimitExceeded",
+    "DDoSProtection",
+    "ExchangeNotAvailable",
+    "OnMaintenance",
+    "RequestTimeout",
+    "YFRateLimitError",
+}
+
+# Starting limits per provider, 'get_limiter()' falls back to 'DEFAULT_LIMITS["default"]'.
+DEFAULT_LIMITS = {
+    "yahoo": {"rate": 5.0, "burst": 10, "max_concurrency": 8},
+    "yahoo_info": {"rate": 5.0, "burst": 10, "max_concurrency": 8},
+    "finviz": {"rate": 1.0, "burst": 2, "max_concurrency": 1},
+    "default": {"rate": 2.0, "burst": 5, "max_concurrency": 4},
+}
+
+
+def is_throttled(error: Exception) -> bool:
+    """
+    True for HTTP 429/5xx errors and the throttling exceptions of the providers.
+    """
+    if any(c.__name__ in THROTTLE_ERRORS for c in type(error).__mro__):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None and getattr(error, "response", None) is not None:
+        status = getattr(error.response, "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or 500 <= status < 600
+    message = str(error)
+    return "429" in message or "Too Many Requests" in message
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        name: str,
+        rate: float = 2.0,
+        burst: int = 5,
+        max_concurrency: int = 4,
+        min_rate: float = 0.1,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+        max_retries: int = 4,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ) -> None:
+        """
+        Token bucket with adaptive (AIMD) rate and a cap on concurrent requests, shared by every caller of a provider.
+
+        Every success raises the rate by 'increase' up to its starting value, every throttled response multiplies
+        it by 'decrease' and pauses the provider with exponential backoff before retrying.
+
+        Parameters
+        ----------
+        name : str
+            Provider or host name.
+        rate : float, optional
+            Requests per second, by default 2.0
+        burst : int, optional
+            Requests that can be made at once after an idle period, by default 5
+        max_concurrency : int, optional
+            Maximum number of requests in flight, by default 4
+        min_rate : float, optional
+            Lowest rate the backoff can reach, by default 0.1
+        increase : float, optional
+            Requests per second added after every success, by default 0.05
+        decrease : float, optional
+            Factor applied to the rate after a throttled response, by default 0.5
+        max_retries : int, optional
+            Retries of a throttled request before the error is raised, by default 4
+        backoff : float, optional
+            Seconds paused after the first throttled response, doubled on every retry, by default 1.0
+        max_backoff : float, optional
+            Longest pause, by default 60.0
+        """
+        self.name = name
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.stats = {
+            "requests": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "throttled": 0,
+            "retries": 0,
+            "errors": 0,
+        }
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Call 'fn(*args, **kwargs)' within the limits, retrying throttled calls.
+        """
+        attempt = 0
+        while True:
+            with self.semaphore:
+                self.acquire()
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    if not is_throttled(e):
+                        self._count("errors")
+                        raise
+                    self.on_throttled(attempt)
+                    if attempt >= self.max_retries:
+                        self._count("errors")
+                        raise
+                else:
+                    self.on_success()
+                    return result
+            attempt += 1
+            self._count("retries")
+
+    def set_limits(self, rate: float = None, burst: int = None):
+        """
+        Change the starting rate and burst of a shared limiter. A limiter that was throttled keeps its
+        lowered rate and climbs back up to the new rate.
+        """
+        with self.lock:
+            if rate is not None:
+                self.max_rate = rate
+                self.rate = (
+                    rate if self.stats["throttled"] == 0 else min(self.rate, rate)
+                )
+            if burst is not None:
+                self.burst = burst
+
+    def acquire(self):
+        """
+        Wait for a token.
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    self.stats["requests"] += 1
+                    if waited > 0:
+                        self.stats["waits"] += 1
+                        self.stats["wait_seconds"] += waited
+                    return
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttled(self, attempt: int = 0):
+        with self.lock:
+            self.stats["throttled"] += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            pause = min(self.backoff * 2**attempt, self.max_backoff)
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            self.tokens = min(self.tokens, 0.0)
+
+    def _count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str, **limits) -> RateLimiter:
+    """
+    Process-wide limiter of a provider. 'limits' override 'DEFAULT_LIMITS' when the limiter is created.
+    """
+    with _limiters_lock:
+        if name not in _limiters:
+            settings = {**DEFAULT_LIMITS.get(name, DEFAULT_LIMITS["default"]), **limits}
+            _limiters[name] = RateLimiter(name, **settings)
+        return _limiters[name]
+
+
+def get_stats() -> dict:
+    """
+    Counters of every limiter, keyed by provider.
+    """
+    with _limiters_lock:
+        return {name: dict(limiter.stats) for name, limiter in _limiters.items()}
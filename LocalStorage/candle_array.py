@@ -0,0 +1,242 @@
+import os
+import json
+
+# Data
+import numpy as np
+import pandas as pd
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+# Column names used by 'CentralizedExchange.fetch_candles()'.
+CCXT_FIELDS = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Volume": "volume_qty",
+}
+
+
+class CandleArray:
+    def __init__(
+        self,
+        symbols: list,
+        timestamps: np.ndarray,
+        fields: dict,
+        tz: str = None,
+    ) -> None:
+        """
+        Compact OHLCV container for many symbols sharing one time axis.
+
+        Each field is a single contiguous (symbols x bars) float32 block and timestamps are int64 epoch
+        nanoseconds, half the memory of the equivalent float64 MultiIndex frame.
+        Bars a symbol doesn't have are NaN. Blocks can be memory-mapped from disk (see 'load()').
+
+        Parameters
+        ----------
+        symbols : list
+            Symbol of every row.
+        timestamps : np.ndarray
+            int64 epoch nanoseconds of every column (UTC when 'tz' is set).
+        fields : dict
+            Field name -> (symbols x bars) float32 array.
+        tz : str, optional
+            Time zone of the original index, by default None (naive timestamps)
+        """
+        self.symbols = list(symbols)
+        self.timestamps = timestamps
+        self.fields = fields
+        self.tz = tz
+        self.positions = {s: i for i, s in enumerate(self.symbols)}
+
+    """
+    ==================================================================================================================================
+    Construction
+    ==================================================================================================================================
+    """
+
+    @classmethod
+    def from_frames(cls, frames, fields: list = FIELDS):
+        """
+        Build from one flat OHLCV frame per symbol (the shape of 'yf.download(..., multi_level_index=False)').
+        Frames are converted one at a time, so when 'frames' is a generator at most one float64 frame is held at once.
+
+        Parameters
+        ----------
+        frames : dict or iterable
+            Symbol -> DataFrame with a DatetimeIndex and 'fields' columns, or (symbol, DataFrame) pairs.
+        fields : list, optional
+            Columns to keep, by default 'FIELDS'
+
+        Returns
+        -------
+        CandleArray
+        """
+        tz = None
+        compact = {}
+        pairs = frames.items() if isinstance(frames, dict) else frames
+        for symbol, frame in pairs:
+            if frame.empty:
+                continue
+            index = frame.index
+            if index.tz is not None:
+                tz = str(index.tz)
+                index = index.tz_convert("UTC").tz_localize(None)
+            values = frame.reindex(columns=fields).to_numpy(dtype=np.float32)
+            compact[symbol] = (index.as_unit("ns").asi8, values)
+            # Release the float64 frame before the next one is read.
+            del frame
+
+        timestamps = np.unique(
+            np.concatenate([t for t, _ in compact.values()] or [np.array([], np.int64)])
+        )
+        symbols = list(compact)
+        blocks = {
+            f: np.full((len(symbols), timestamps.size), np.nan, np.float32)
+            for f in fields
+        }
+        for row, (symbol_timestamps, values) in enumerate(compact.values()):
+            columns = np.searchsorted(timestamps, symbol_timestamps)
+            for i, f in enumerate(fields):
+                blocks[f][row, columns] = values[:, i]
+        return cls(symbols, timestamps, blocks, tz)
+
+    @classmethod
+    def from_frame(
+        cls, candles: pd.DataFrame, symbol: str = None, fields: list = FIELDS
+    ):
+        """
+        Build from a 'yf.download()' frame: (Price, Ticker) MultiIndex columns,
+        or flat columns for a single 'symbol'.
+        """
+        if isinstance(candles.columns, pd.MultiIndex):
+            level = (
+                candles.columns.names.index("Ticker")
+                if "Ticker" in candles.columns.names
+                else 1
+            )
+            tickers = list(dict.fromkeys(candles.columns.get_level_values(level)))
+            frames = ((t, candles.xs(t, axis=1, level=level)) for t in tickers)
+        else:
+            frames = [(symbol, candles)]
+        return cls.from_frames(frames, fields)
+
+    @classmethod
+    def from_store(
+        cls,
+        store,
+        symbols: list,
+        interval: str = "1d",
+        start=None,
+        end=None,
+        sessions: int = None,
+    ):
+        """
+        Build from the candles stored in a 'CandleStore', reading one symbol at a time.
+        """
+        return cls.from_frames(
+            (s, store.read(s, interval, start, end, sessions)) for s in symbols
+        )
+
+    """
+    ==================================================================================================================================
+    Persistence
+    ==================================================================================================================================
+    """
+
+    def save(self, path: str):
+        """
+        Write one '.npy' file per block plus 'meta.json' into the directory 'path'.
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "timestamps.npy"), self.timestamps)
+        for name, block in self.fields.items():
+            np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(block))
+        meta = {"symbols": self.symbols, "fields": list(self.fields), "tz": self.tz}
+        with open(os.path.join(path, "meta.json"), "w") as file:
+            json.dump(meta, file)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True):
+        """
+        Load a directory written by 'save()'. With 'mmap' the blocks are memory-mapped read-only,
+        so only the pages of the symbols and bars that are accessed are read from disk.
+        """
+        with open(os.path.join(path, "meta.json"), "r") as file:
+            meta = json.load(file)
+        mode = "r" if mmap else None
+        timestamps = np.load(os.path.join(path, "timestamps.npy"), mmap_mode=mode)
+        fields = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+            for name in meta["fields"]
+        }
+        return cls(meta["symbols"], timestamps, fields, meta["tz"])
+
+    """
+    ==================================================================================================================================
+    Access
+    ==================================================================================================================================
+    """
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.positions
+
+    def __getitem__(self, symbol: str) -> dict:
+        """
+        Field -> 1D view of 'symbol' (no copy).
+        """
+        row = self.positions[symbol]
+        return {name: block[row] for name, block in self.fields.items()}
+
+    def field(self, name: str) -> np.ndarray:
+        return self.fields[name]
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + sum(b.nbytes for b in self.fields.values())
+
+    def get_index(self) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(self.timestamps.astype("datetime64[ns]"))
+        if self.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self.tz)
+        return index
+
+    def to_frame(self, symbol: str, dropna: bool = True) -> pd.DataFrame:
+        """
+        Flat OHLCV frame of one symbol, like 'yf.download(symbol, multi_level_index=False)'.
+        """
+        frame = pd.DataFrame(self[symbol], index=self.get_index())
+        if dropna:
+            frame = frame.dropna(how="all")
+        return frame
+
+    def to_multi_frame(self, symbols: list = None) -> pd.DataFrame:
+        """
+        (Price, Ticker) MultiIndex frame, like 'yf.download(symbols)'.
+        """
+        symbols = self.symbols if symbols is None else list(symbols)
+        rows = [self.positions[s] for s in symbols]
+        blocks = [self.fields[f][rows].T for f in self.fields]
+        columns = pd.MultiIndex.from_product(
+            [list(self.fields), symbols], names=["Price", "Ticker"]
+        )
+        return pd.DataFrame(
+            np.concatenate(blocks, axis=1), index=self.get_index(), columns=columns
+        )
+
+    def to_ccxt_frame(self, symbol: str) -> pd.DataFrame:
+        """
+        Frame with the lowercase 'open', 'high', 'low', 'close', 'volume_qty' columns and UTC 'timestamp'
+        index that 'CentralizedExchange.fetch_candles()' builds from raw OHLCV.
+        """
+        frame = self.to_frame(symbol).rename(columns=CCXT_FIELDS)
+        index = frame.index
+        frame.index = (
+            index.tz_convert("UTC")
+            if index.tz is not None
+            else index.tz_localize("UTC")
+        )
+        frame.index.name = "timestamp"
+        return frame
@@ -0,0 +1,576 @@
+import os
+import re
+import json
+import threading
+from concurrent.futures import wait
+
+# Data
+import numpy as np
+import pandas as pd
+
+# Storage
+from LocalStorage.candle_array import CandleArray
+
+# Data providers
+from DataProviders.coalescing import coalescer, batcher
+
+candle_storage = "./LocalStorage/Candles"
+
+# Length of a bar, also how old the end of a cached range may be before it is fetched again.
+INTERVAL_SECONDS = {
+    "1m": 60,
+    "2m": 120,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1_800,
+    "60m": 3_600,
+    "90m": 5_400,
+    "1h": 3_600,
+    "1d": 86_400,
+    "5d": 432_000,
+    "1wk": 604_800,
+    "1mo": 2_592_000,
+    "3mo": 7_776_000,
+}
+# Start of a 'period="max"' range.
+MAX_START = pd.Timestamp("1900-01-01")
+
+
+def to_utc(timestamp) -> pd.Timestamp:
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tz is None:
+        return timestamp.tz_localize("UTC")
+    return timestamp.tz_convert("UTC")
+
+
+def to_utc_naive(timestamp) -> pd.Timestamp:
+    """
+    Naive UTC timestamp, the form covered ranges are stored and compared in.
+    """
+    return to_utc(timestamp).tz_localize(None)
+
+
+def period_start(period: str, now: pd.Timestamp) -> pd.Timestamp:
+    """
+    First timestamp of a yfinance style period ("5d", "1mo", "ytd", "max", ...) ending at 'now'.
+    """
+    if period == "max":
+        return MAX_START
+    if period == "ytd":
+        return pd.Timestamp(now.year, 1, 1)
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if match is None:
+        raise ValueError(f"Invalid period '{period}'.")
+    n, unit = int(match.group(1)), match.group(2)
+    offsets = {
+        "d": pd.DateOffset(days=n),
+        "wk": pd.DateOffset(weeks=n),
+        "mo": pd.DateOffset(months=n),
+        "y": pd.DateOffset(years=n),
+    }
+    return now - offsets[unit]
+
+
+def period_sessions(period: str):
+    """
+    Number of trading sessions of a "Nd" period, None for calendar periods.
+    Like yfinance, "1d" and "5d" are the last 1 and 5 sessions, not the last 24 hours or 5 calendar days.
+    """
+    match = re.fullmatch(r"(\d+)d", period)
+    return None if match is None else int(match.group(1))
+
+
+def session_lookback(sessions: int) -> pd.DateOffset:
+    """
+    Calendar window long enough to contain the last 'sessions' sessions, weekends and holidays included.
+    """
+    return pd.DateOffset(days=sessions * 7 // 5 + 10)
+
+
+# One lock per store directory, so separate 'CandleStore' instances don't overwrite each other's index updates.
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def get_lock(root: str) -> threading.Lock:
+    with _locks_lock:
+        return _locks.setdefault(os.path.abspath(root), threading.Lock())
+
+
+class CandleStore:
+    def __init__(self, root: str = candle_storage, source: str = "yahoo") -> None:
+        """
+        Local candle cache keyed by (source, symbol, interval).
+
+        Candles are stored as one Parquet file per month under 'root/source/interval/symbol/YYYY-MM.parquet'.
+        'root/index.json' records the time ranges already downloaded for every key, so a request that
+        falls inside a covered range is answered from disk without touching the network.
+
+        Parameters
+        ----------
+        root : str, optional
+            Directory of the store, by default 'candle_storage'
+        source : str, optional
+            Name of the data source, by default "yahoo"
+        """
+        self.root = root
+        self.source = source
+        self.index_path = os.path.join(root, "index.json")
+        self.lock = get_lock(root)
+
+    """
+    ==================================================================================================================================
+    yfinance interface
+    ==================================================================================================================================
+    """
+
+    def download(
+        self,
+        tickers,
+        period: str = "max",
+        interval: str = "1d",
+        start=None,
+        end=None,
+        prepost: bool = False,
+        multi_level_index: bool = True,
+        max_age: float = None,
+    ) -> pd.DataFrame:
+        """
+        Drop-in replacement of 'yf.download()' that reads through the store.
+        Only the tickers whose requested range isn't covered yet are downloaded, in a single request.
+
+        Parameters
+        ----------
+        tickers : str or list
+            Ticker(s) to download.
+        period : str, optional
+            Period to download when 'start' isn't set, by default "max"
+        interval : str, optional
+            Candle interval, by default "1d"
+        start : datetime-like, optional
+            First candle to include, by default None
+        end : datetime-like, optional
+            Last candle to include (exclusive, like yfinance), by default now
+        prepost : bool, optional
+            Include pre/post market candles, stored under a separate key, by default False
+        multi_level_index : bool, optional
+            Return (Price, Ticker) columns like yfinance, only applies to a single ticker, by default True
+        max_age : float, optional
+            Seconds the end of a cached range stays current, by default the length of one bar
+
+        Returns
+        -------
+        pd.DataFrame
+            Candles shaped like the output of 'yf.download()'.
+        """
+        single = isinstance(tickers, str)
+        tickers = [tickers] if single else list(tickers)
+        tickers = [t.upper() for t in tickers]
+        key_interval, request_start, request_end = self.update(
+            tickers, period, interval, start, end, prepost, max_age
+        )
+        sessions = period_sessions(period) if start is None else None
+        frames = {
+            t: self.read(t, key_interval, request_start, request_end, sessions)
+            for t in tickers
+        }
+        if single and not multi_level_index:
+            return frames[tickers[0]]
+        return self._to_multi_frame(frames)
+
+    def update(
+        self,
+        tickers: list,
+        period: str = "max",
+        interval: str = "1d",
+        start=None,
+        end=None,
+        prepost: bool = False,
+        max_age: float = None,
+    ) -> tuple:
+        """
+        Download the candles of 'tickers' that aren't stored yet, without reading them back.
+        See 'download()' for the parameters.
+
+        Returns
+        -------
+        tuple
+            (key_interval, start, end) of the requested range in the store. For session periods ("Nd"), 'start'
+            is the beginning of a calendar window containing the sessions, read them with 'read(..., sessions=N)'.
+        """
+        tickers = [t.upper() for t in tickers]
+        key_interval = self._get_key_interval(interval, prepost)
+        if max_age is None:
+            max_age = INTERVAL_SECONDS.get(interval, 86_400)
+        now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+        request_start = pd.Timestamp(start) if start is not None else None
+        request_end = pd.Timestamp(end) if end is not None else now
+        sessions = period_sessions(period) if start is None else None
+        if request_start is None and sessions is not None:
+            request_start = request_end - session_lookback(sessions)
+        elif request_start is None:
+            request_start = period_start(period, request_end)
+
+        # Start of the requested data per ticker, None when the store can't tell (the sessions aren't stored yet).
+        starts = {t: request_start for t in tickers}
+        if sessions is not None:
+            starts = {
+                t: self._get_session_start(
+                    t, key_interval, request_start, request_end, sessions
+                )
+                for t in tickers
+            }
+        missing = [
+            t
+            for t in tickers
+            if starts[t] is None
+            or not self.is_covered(
+                t, key_interval, starts[t], request_end, max_age, now
+            )
+        ]
+        # Series already stored from the requested start only need the bars after their last one.
+        tails = {}
+        if end is None:
+            for t in missing:
+                if starts[t] is None:
+                    continue
+                last = self._get_tail_start(t, key_interval, starts[t])
+                if last is not None:
+                    tails[t] = last
+        full = [t for t in missing if t not in tails]
+        if full != []:
+            if start is not None:
+                request = {"start": start, "end": end}
+            else:
+                request = {"period": period}
+            # Sessions returned for a "Nd" period are covered from the first one, not from a calendar start.
+            self._fetch(
+                full,
+                interval,
+                prepost,
+                key_interval,
+                None if sessions is not None else request_start,
+                request_end,
+                request,
+            )
+        if tails != {}:
+            # One request from the oldest last bar, overlapping bars are deduplicated on write.
+            request = {"start": min(to_utc(s) for s in tails.values())}
+            self._fetch(
+                list(tails),
+                interval,
+                prepost,
+                key_interval,
+                tails,
+                request_end,
+                request,
+            )
+        return key_interval, request_start, request_end
+
+    def get_array(
+        self,
+        tickers: list,
+        period: str = "max",
+        interval: str = "1d",
+        start=None,
+        end=None,
+        prepost: bool = False,
+        max_age: float = None,
+    ) -> CandleArray:
+        """
+        Same as 'download()' but returns a compact CandleArray, reading one ticker at a time
+        so a large universe never needs a full float64 frame in memory.
+        """
+        key_interval, request_start, request_end = self.update(
+            tickers, period, interval, start, end, prepost, max_age
+        )
+        sessions = period_sessions(period) if start is None else None
+        return CandleArray.from_store(
+            self,
+            [t.upper() for t in tickers],
+            key_interval,
+            request_start,
+            request_end,
+            sessions,
+        )
+
+    def save_array(self, name: str, candles: CandleArray) -> str:
+        """
+        Save a CandleArray under 'root/Arrays/name' so it can be memory-mapped later.
+        """
+        path = os.path.join(self.root, "Arrays", name)
+        candles.save(path)
+        return path
+
+    def load_array(self, name: str, mmap: bool = True) -> CandleArray:
+        return CandleArray.load(os.path.join(self.root, "Arrays", name), mmap)
+
+    def _fetch(
+        self,
+        tickers: list,
+        interval: str,
+        prepost: bool,
+        key_interval: str,
+        covered_start,
+        covered_end,
+        request: dict,
+    ):
+        """
+        Download 'tickers' in one request and store every ticker that returned candles.
+        'covered_start' is a timestamp, a dict with one timestamp per ticker, or None to cover each ticker
+        from the start of the first session it returned.
+
+        Tickers another consumer is already downloading with the same request are not downloaded again,
+        their download is awaited instead. Concurrent requests are merged into one 'yf.download()'.
+        """
+        keys = {t: self._get_flight_key(t, key_interval, request) for t in tickers}
+        owned, pending = coalescer.claim(list(keys.values()))
+        owned = set(owned)
+        fetch = [t for t in tickers if keys[t] in owned]
+        try:
+            if fetch != []:
+                data = batcher.download(
+                    fetch, interval=interval, prepost=prepost, **request
+                )
+                covered = []
+                for t in fetch:
+                    if data.empty or t not in data.columns.get_level_values("Ticker"):
+                        continue
+                    candles = data.xs(t, axis=1, level="Ticker").dropna(how="all")
+                    if candles.empty:
+                        continue
+                    start = (
+                        covered_start[t]
+                        if isinstance(covered_start, dict)
+                        else covered_start
+                    )
+                    if start is None:
+                        start = candles.index[0].normalize()
+                    self.write(
+                        t, key_interval, candles, start, covered_end, add_range=False
+                    )
+                    covered.append((t, key_interval, start, covered_end))
+                # One index update for the whole batch.
+                with self.lock:
+                    self._add_ranges(covered)
+        except Exception as e:
+            coalescer.release(list(owned), error=e)
+            raise
+        coalescer.release(list(owned))
+        # A failed download of another consumer leaves the ticker missing, like a failed 'yf.download()'.
+        wait(list(pending.values()))
+
+    def _get_session_start(self, symbol: str, interval: str, start, end, sessions: int):
+        """
+        Naive UTC timestamp of the first stored bar of the last 'sessions' sessions within [start, end),
+        None when fewer sessions are stored.
+        """
+        candles = self.read(symbol, interval, start, end)
+        if candles.empty:
+            return None
+        days = candles.index.normalize().unique()
+        if len(days) < sessions:
+            return None
+        return to_utc_naive(days[-sessions])
+
+    def _get_tail_start(self, symbol: str, interval: str, start):
+        """
+        Timestamp of the last stored bar when a covered range of the key contains 'start', else None.
+        The last bar is fetched again since it may have been incomplete when it was stored.
+        """
+        start = to_utc_naive(start)
+        for range_start, range_end in self.get_ranges(symbol, interval):
+            if range_start <= start <= range_end:
+                return self.get_last_timestamp(symbol, interval)
+        return None
+
+    """
+    ==================================================================================================================================
+    Storage
+    ==================================================================================================================================
+    """
+
+    def read(
+        self, symbol: str, interval: str, start=None, end=None, sessions: int = None
+    ) -> pd.DataFrame:
+        """
+        Stored candles of a key within [start, end), only the monthly files overlapping the range are opened.
+        With 'sessions', only the bars of the last 'sessions' trading days of the range are kept.
+        """
+        directory = self._get_directory(symbol, interval)
+        if not os.path.isdir(directory):
+            return pd.DataFrame()
+        months = sorted(f[:-8] for f in os.listdir(directory) if f.endswith(".parquet"))
+        if start is not None:
+            months = [m for m in months if m >= pd.Timestamp(start).strftime("%Y-%m")]
+        if end is not None:
+            months = [m for m in months if m <= pd.Timestamp(end).strftime("%Y-%m")]
+        if months == []:
+            return pd.DataFrame()
+        candles = pd.concat(
+            [pd.read_parquet(os.path.join(directory, f"{m}.parquet")) for m in months]
+        )
+        index = candles.index
+        if start is not None:
+            candles = candles[index >= self._align(start, index)]
+            index = candles.index
+        if end is not None:
+            candles = candles[index < self._align(end, index)]
+        if sessions is not None and not candles.empty:
+            days = candles.index.normalize()
+            candles = candles[days >= days.unique()[-sessions:][0]]
+        return candles
+
+    def write(
+        self,
+        symbol: str,
+        interval: str,
+        candles: pd.DataFrame,
+        start,
+        end,
+        add_range: bool = True,
+    ):
+        """
+        Merge candles into the monthly files of a key (newer rows win on duplicate timestamps)
+        and record [start, end] as covered, unless 'add_range' is False.
+        """
+        directory = self._get_directory(symbol, interval)
+        index = candles.index
+        month_keys = index.year * 100 + index.month
+        with self.lock:
+            os.makedirs(directory, exist_ok=True)
+            for month in np.unique(month_keys):
+                path = os.path.join(
+                    directory, f"{month // 100:04d}-{month % 100:02d}.parquet"
+                )
+                rows = candles[month_keys == month]
+                if os.path.exists(path):
+                    rows = pd.concat([pd.read_parquet(path), rows])
+                    rows = rows[~rows.index.duplicated(keep="last")].sort_index()
+                rows.to_parquet(path)
+            if add_range:
+                self._add_ranges([(symbol, interval, start, end)])
+
+    def is_covered(
+        self, symbol: str, interval: str, start, end, max_age: float = 0, now=None
+    ) -> bool:
+        """
+        True if [start, end] lies inside a downloaded range. A range that ended less than 'max_age'
+        seconds before 'now' counts as reaching 'now'.
+        """
+        if now is None:
+            now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+        start, end = to_utc_naive(start), to_utc_naive(end)
+        if now - end < pd.Timedelta(seconds=max_age):
+            end = now - pd.Timedelta(seconds=max_age)
+        for range_start, range_end in self.get_ranges(symbol, interval):
+            if range_start <= start and range_end >= end:
+                return True
+        return False
+
+    def get_last_timestamp(self, symbol: str, interval: str):
+        """
+        Timestamp of the last stored bar of a key, None when nothing is stored.
+        """
+        directory = self._get_directory(symbol, interval)
+        if not os.path.isdir(directory):
+            return None
+        months = sorted(f for f in os.listdir(directory) if f.endswith(".parquet"))
+        if months == []:
+            return None
+        return pd.read_parquet(os.path.join(directory, months[-1])).index[-1]
+
+    def get_ranges(self, symbol: str, interval: str) -> list:
+        entry = self._read_index().get(self._get_key(symbol, interval), [])
+        return [(pd.Timestamp(s), pd.Timestamp(e)) for s, e in entry]
+
+    def invalidate(self, symbol: str, interval: str):
+        """
+        Forget the covered ranges of a key, so the next request downloads it again.
+        """
+        with self.lock:
+            index = self._read_index()
+            index.pop(self._get_key(symbol, interval), None)
+            self._write_index(index)
+
+    def _add_ranges(self, covered: list):
+        """
+        Record (symbol, interval, start, end) ranges as covered, with a single index write.
+        """
+        if covered == []:
+            return
+        index = self._read_index()
+        for symbol, interval, start, end in covered:
+            key = self._get_key(symbol, interval)
+            ranges = [(pd.Timestamp(s), pd.Timestamp(e)) for s, e in index.get(key, [])]
+            ranges.append((to_utc_naive(start), to_utc_naive(end)))
+            # Merge overlapping ranges.
+            merged = []
+            for s, e in sorted(ranges):
+                if merged != [] and s <= merged[-1][1]:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+                else:
+                    merged.append((s, e))
+            index[key] = [[s.isoformat(), e.isoformat()] for s, e in merged]
+        self._write_index(index)
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self.index_path, "r") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_index(self, index: dict):
+        os.makedirs(self.root, exist_ok=True)
+        temporary = f"{self.index_path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(index, file, indent=1)
+        os.replace(temporary, self.index_path)
+
+    """
+    ==================================================================================================================================
+    Utilities
+    ==================================================================================================================================
+    """
+
+    def _get_key(self, symbol: str, interval: str) -> str:
+        return f"{self.source}/{interval}/{symbol.upper()}"
+
+    def _get_key_interval(self, interval: str, prepost: bool) -> str:
+        # Extended hours only change intraday candles.
+        if prepost and INTERVAL_SECONDS.get(interval, 86_400) < 86_400:
+            return f"{interval}-prepost"
+        return interval
+
+    def _get_flight_key(self, symbol: str, interval: str, request: dict) -> tuple:
+        request = tuple(sorted((k, str(v)) for k, v in request.items()))
+        return (os.path.abspath(self.root), self.source, interval, symbol, request)
+
+    def _get_directory(self, symbol: str, interval: str) -> str:
+        # Exchange pairs ('BTC/USD') can't be used as directory names as is.
+        symbol = symbol.upper().replace("/", "-")
+        return os.path.join(self.root, self.source, interval, symbol)
+
+    def _align(self, timestamp, index: pd.DatetimeIndex) -> pd.Timestamp:
+        """
+        Compare naive UTC request bounds with tz-aware candle indexes.
+        """
+        timestamp = pd.Timestamp(timestamp)
+        if index.tz is not None and timestamp.tz is None:
+            return timestamp.tz_localize("UTC")
+        if index.tz is None and timestamp.tz is not None:
+            return timestamp.tz_convert("UTC").tz_localize(None)
+        return timestamp
+
+    def _to_multi_frame(self, frames: dict) -> pd.DataFrame:
+        frames = {t: f for t, f in frames.items() if not f.empty}
+        if frames == {}:
+            return pd.DataFrame()
+        data = pd.concat(frames, axis=1, names=["Ticker", "Price"])
+        data = data.reorder_levels(["Price", "Ticker"], axis=1)
+        fields = list(dict.fromkeys(data.columns.get_level_values("Price")))
+        columns = pd.MultiIndex.from_product(
+            [fields, list(frames)], names=["Price", "Ticker"]
+        )
+        return data.reindex(columns=columns)
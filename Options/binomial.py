@@ -0,0 +1,156 @@
+# Data
+import numpy as np
+
+# Pricing
+from Options.pricing import is_call_mask
+
+
+class BinomialEngine:
+    def __init__(
+        self,
+        steps: int = 101,
+        method: str = "leisen_reimer",
+        american: bool = True,
+        chunk_size: int = 4096,
+    ) -> None:
+        """
+        Binomial tree pricer that walks the trees of many contracts at once as (contracts x steps) arrays.
+        Contracts are processed in chunks that reuse the same tree buffers, so memory stays at
+        roughly 3 * chunk_size * (steps + 1) floats regardless of the chain size.
+
+        Parameters
+        ----------
+        steps : int, optional
+            Number of time steps, rounded up to an odd number for Leisen-Reimer, by default 101
+        method : str, optional
+            "crr" (Cox-Ross-Rubinstein) or "leisen_reimer", by default "leisen_reimer"
+        american : bool, optional
+            Allow early exercise, by default True
+        chunk_size : int, optional
+            Contracts priced per pass, by default 4096
+        """
+        if method not in ["crr", "leisen_reimer"]:
+            raise ValueError("Invalid method. Use 'crr' or 'leisen_reimer'.")
+        if method == "leisen_reimer" and steps % 2 == 0:
+            steps += 1
+        self.steps = steps
+        self.method = method
+        self.american = american
+        self.chunk_size = chunk_size
+        self._buffers = None
+
+    def price(self, S, K, T, r, sigma, option_type, q=0.0) -> np.ndarray:
+        """
+        Price every contract.
+
+        Parameters
+        ----------
+        S : array-like
+            Stock price.
+        K : array-like
+            Strike price.
+        T : array-like
+            Time to expiration (in years).
+        r : array-like
+            Risk-free interest rate (annualized).
+        sigma : array-like
+            Volatility (annualized).
+        option_type : array-like
+            "call"/"put" strings or a boolean call mask.
+        q : array-like, optional
+            Dividend yield, by default 0.0
+
+        Returns
+        -------
+        np.ndarray
+            Option prices, intrinsic value for expired contracts and NaN for invalid inputs.
+        """
+        S, K, T, r, sigma, q = np.broadcast_arrays(
+            *(np.asarray(x, dtype=np.float64) for x in (S, K, T, r, sigma, q))
+        )
+        shape = S.shape
+        is_call = np.broadcast_to(is_call_mask(option_type), shape).ravel()
+        S, K, T, r, sigma, q = (x.ravel() for x in (S, K, T, r, sigma, q))
+
+        sign = np.where(is_call, 1.0, -1.0)
+        prices = np.full(S.size, np.nan)
+        expired = (T <= 0) & (S > 0) & (K > 0)
+        prices[expired] = np.maximum(sign[expired] * (S[expired] - K[expired]), 0)
+
+        rows = np.flatnonzero((S > 0) & (K > 0) & (T > 0) & (sigma > 0))
+        for start in range(0, rows.size, self.chunk_size):
+            chunk = rows[start : start + self.chunk_size]
+            prices[chunk] = self._price_chunk(
+                S[chunk],
+                K[chunk],
+                T[chunk],
+                r[chunk],
+                sigma[chunk],
+                q[chunk],
+                sign[chunk],
+            )
+        return prices.reshape(shape)
+
+    def _get_buffers(self, rows: int):
+        if self._buffers is None or self._buffers[0].shape[0] < rows:
+            self._buffers = tuple(np.empty((rows, self.steps + 1)) for _ in range(3))
+        return (b[:rows] for b in self._buffers)
+
+    def _tree_parameters(self, S, K, T, r, sigma, q):
+        """
+        Up/down factors and up probability of every contract's tree.
+        """
+        n = self.steps
+        dt = T / n
+        growth = np.exp((r - q) * dt)
+        if self.method == "crr":
+            u = np.exp(sigma * np.sqrt(dt))
+            d = 1 / u
+            p = (growth - d) / (u - d)
+        else:
+            vol_sqrt_t = sigma * np.sqrt(T)
+            d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / vol_sqrt_t
+            d2 = d1 - vol_sqrt_t
+            p = self._peizer_pratt(d2)
+            p_bar = self._peizer_pratt(d1)
+            u = growth * p_bar / p
+            d = (growth - p * u) / (1 - p)
+        return u, d, p, np.exp(-r * dt)
+
+    def _peizer_pratt(self, z: np.ndarray) -> np.ndarray:
+        n = self.steps
+        x = z / (n + 1 / 3 + 0.1 / (n + 1))
+        return 0.5 + np.sign(z) * np.sqrt(0.25 - 0.25 * np.exp(-(x**2) * (n + 1 / 6)))
+
+    def _price_chunk(self, S, K, T, r, sigma, q, sign) -> np.ndarray:
+        n = self.steps
+        u, d, p, disc = self._tree_parameters(S, K, T, r, sigma, q)
+        values, stock, scratch = self._get_buffers(S.size)
+        up_weight = (p * disc)[:, None]
+        down_weight = ((1 - p) * disc)[:, None]
+        K = K[:, None]
+        sign = sign[:, None]
+
+        # Terminal nodes, j up moves and n - j down moves.
+        j = np.arange(n + 1)
+        np.exp(j * np.log(u)[:, None] + (n - j) * np.log(d)[:, None], out=stock)
+        stock *= S[:, None]
+        np.subtract(stock, K, out=values)
+        values *= sign
+        np.maximum(values, 0, out=values)
+
+        d = d[:, None]
+        for i in range(n - 1, -1, -1):
+            v = values[:, : i + 1]
+            tmp = scratch[:, : i + 1]
+            np.multiply(values[:, 1 : i + 2], up_weight, out=tmp)
+            v *= down_weight
+            v += tmp
+            if self.american:
+                # One step back in time is one fewer down move.
+                s = stock[:, : i + 1]
+                s /= d
+                np.subtract(s, K, out=tmp)
+                tmp *= sign
+                np.maximum(v, tmp, out=v)
+        return values[:, 0].copy()
@@ -0,0 +1,173 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Data
+import pandas as pd
+import yfinance as yf
+
+# Data providers
+from DataProviders.provider import get_provider
+
+# Contracts
+from Options.contract_symbols import ContractSymbolParser, days_to_expiration
+
+
+class ChainLoader:
+    def __init__(self, max_workers: int = 8, date_format: str = "%Y-%m-%d") -> None:
+        """
+        Load option chains for many expirations (and tickers) through a bounded thread pool.
+
+        Parameters
+        ----------
+        max_workers : int, optional
+            Maximum number of concurrent requests, by default 8
+        date_format : str, optional
+            Format of the expiration dates, by default "%Y-%m-%d"
+        """
+        self.max_workers = max_workers
+        self.date_format = date_format
+        # Kept across loads so refreshed chains only parse new contracts.
+        self.symbol_parser = ContractSymbolParser()
+        # Timing and errors of the last load, one row per (ticker, expiration).
+        self.report = pd.DataFrame()
+
+    def get_expirations(
+        self, ticker: str, start_date: str = "", end_date: str = ""
+    ) -> list:
+        """
+        Get the listed expiration dates of 'ticker', optionally restricted to a date range (inclusive).
+
+        Parameters
+        ----------
+        ticker : str
+            Ticker of the underlying.
+        start_date : str, optional
+            First expiration to include, by default ""
+        end_date : str, optional
+            Last expiration to include, by default ""
+
+        Returns
+        -------
+        list
+            Expiration dates as strings.
+        """
+        expirations = list(
+            get_provider().fetch(
+                "yahoo",
+                ("options", ticker.upper()),
+                lambda: yf.Ticker(ticker.upper()).options,
+            )
+        )
+        if start_date != "":
+            expirations = [e for e in expirations if e >= start_date]
+        if end_date != "":
+            expirations = [e for e in expirations if e <= end_date]
+        return expirations
+
+    def load(
+        self,
+        ticker: str,
+        expirations: list = None,
+        start_date: str = "",
+        end_date: str = "",
+    ) -> pd.DataFrame:
+        """
+        Load every expiration of 'ticker' (or the ones requested) concurrently.
+
+        Parameters
+        ----------
+        ticker : str
+            Ticker of the underlying.
+        expirations : list, optional
+            Expirations to load, by default every listed expiration within 'start_date' and 'end_date'.
+        start_date : str, optional
+            First expiration to include, by default ""
+        end_date : str, optional
+            Last expiration to include, by default ""
+
+        Returns
+        -------
+        pd.DataFrame
+            Calls and puts of every expiration with 'option_type', 'underlying', 'expirationDate' and 'dte' columns.
+        """
+        return self.load_many([ticker], expirations, start_date, end_date)
+
+    def load_many(
+        self,
+        tickers: list,
+        expirations: list = None,
+        start_date: str = "",
+        end_date: str = "",
+    ) -> pd.DataFrame:
+        """
+        Load the chains of several underlyings. Expiration lookups and chain requests of every ticker share one pool.
+        See 'load()' for the parameters. Per request timing and failures are stored in 'self.report'.
+        """
+        tickers = [t.upper() for t in tickers]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            if expirations is None:
+                listed = pool.map(
+                    lambda t: self.get_expirations(t, start_date, end_date), tickers
+                )
+                jobs = [(t, e) for t, exps in zip(tickers, listed) for e in exps]
+            else:
+                jobs = [(t, e) for t in tickers for e in expirations]
+            results = list(pool.map(lambda job: self._fetch_expiration(*job), jobs))
+
+        frames = [r["chain"] for r in results if r["chain"] is not None]
+        self.report = pd.DataFrame(
+            [{k: v for k, v in r.items() if k != "chain"} for r in results],
+            columns=["ticker", "expirationDate", "rows", "seconds", "error"],
+        )
+        if frames == []:
+            return pd.DataFrame()
+        chain = pd.concat(frames, ignore_index=True)
+        return self._apply_contract_columns(chain)
+
+    def _apply_contract_columns(self, chain: pd.DataFrame) -> pd.DataFrame:
+        """
+        Typed root/expiration/type columns parsed from the contract symbols of the whole chain at once.
+        The values tagged per request are kept for symbols that aren't OCC formatted.
+        """
+        parsed = self.symbol_parser.parse(chain["contractSymbol"])
+        chain["root"] = parsed["root"]
+        chain["option_type"] = parsed["option_type"].fillna(chain["option_type"])
+        chain["expirationDate"] = parsed["expirationDate"].fillna(
+            chain["expirationDate"]
+        )
+        chain["dte"] = days_to_expiration(chain["expirationDate"])
+        return chain
+
+    def get_failures(self) -> pd.DataFrame:
+        if self.report.empty:
+            return self.report
+        return self.report[self.report["error"].notna()]
+
+    def _fetch_expiration(self, ticker: str, expiration: str) -> dict:
+        start = time.perf_counter()
+        result = {
+            "ticker": ticker,
+            "expirationDate": expiration,
+            "rows": 0,
+            "seconds": 0.0,
+            "error": None,
+            "chain": None,
+        }
+        try:
+            # Only the frames are kept, yfinance returns a namedtuple that can't be recorded.
+            calls, puts = get_provider().fetch(
+                "yahoo",
+                ("option_chain", ticker, expiration),
+                lambda: tuple(yf.Ticker(ticker).option_chain(expiration))[:2],
+            )
+            calls = calls.assign(option_type="call")
+            puts = puts.assign(option_type="put")
+            df = pd.concat([calls, puts], ignore_index=True)
+            df["underlying"] = ticker
+            df["expirationDate"] = pd.Timestamp(expiration)
+            result["chain"] = df
+            result["rows"] = len(df)
+        except Exception as e:
+            result["error"] = str(e)
+        result["seconds"] = time.perf_counter() - start
+        return result
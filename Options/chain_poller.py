@@ -0,0 +1,289 @@
+import time
+import threading
+
+# Data
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+# Options
+from Options.option_utils import OptionScalping
+
+# Data providers
+from DataProviders.provider import get_provider
+
+
+class ChainChanges:
+    def __init__(
+        self,
+        new: pd.DataFrame,
+        removed: list,
+        updated: pd.DataFrame,
+        spot: float,
+        full_refresh: bool,
+    ) -> None:
+        """
+        Difference between two polls of an options chain.
+
+        Parameters
+        ----------
+        new : pd.DataFrame
+            Contracts that weren't listed in the previous poll, with their Greeks.
+        removed : list
+            Symbols of the contracts that are no longer listed.
+        updated : pd.DataFrame
+            Contracts whose quote, implied volatility or Greeks changed.
+        spot : float
+            Price of the underlying used for this poll.
+        full_refresh : bool
+            True when every contract was recomputed (underlying moved or the state was stale).
+        """
+        self.new = new
+        self.removed = removed
+        self.updated = updated
+        self.spot = spot
+        self.full_refresh = full_refresh
+        self.time = pd.Timestamp.now()
+
+    def is_empty(self) -> bool:
+        return self.new.empty and self.updated.empty and self.removed == []
+
+    def __repr__(self) -> str:
+        return (
+            f"ChainChanges(new={len(self.new)}, removed={len(self.removed)}, "
+            f"updated={len(self.updated)}, full_refresh={self.full_refresh})"
+        )
+
+
+class ChainPoller:
+    def __init__(
+        self,
+        ticker: str,
+        expiration_date: str = "",
+        interval: float = 5.0,
+        underlying_tolerance: float = 0.0005,
+        full_refresh_seconds: float = 60.0,
+        scalper: OptionScalping = None,
+    ) -> None:
+        """
+        Poll an options chain and only recompute the contracts that changed since the previous poll.
+
+        The previous chain is kept keyed by contract symbol. Implied volatility and Greeks are recomputed for
+        new contracts and for contracts whose bid, ask or Yahoo implied volatility changed. Every contract is
+        recomputed when the underlying moved more than 'underlying_tolerance' or 'full_refresh_seconds' passed,
+        so time decay is applied periodically rather than on every tick.
+
+        Parameters
+        ----------
+        ticker : str
+            Ticker of the underlying.
+        expiration_date : str, optional
+            Expiration to poll, by default "" (nearest expiration)
+        interval : float, optional
+            Seconds between polls in 'run()', by default 5.0
+        underlying_tolerance : float, optional
+            Relative move of the underlying that triggers a full recompute, by default 0.0005 (5 bps)
+        full_refresh_seconds : float, optional
+            Maximum age of unchanged rows before they are recomputed, by default 60.0
+        scalper : OptionScalping, optional
+            Provides the chain loader, risk-free rate and IV/Greeks calculations, by default a new OptionScalping
+        """
+        self.ticker = ticker.upper()
+        self.expiration_date = expiration_date
+        self.interval = interval
+        self.underlying_tolerance = underlying_tolerance
+        self.full_refresh_seconds = full_refresh_seconds
+        self.scalper = (
+            OptionScalping(store_chains=False) if scalper is None else scalper
+        )
+        self.quote_columns = ["bid", "ask", "impliedVolatility"]
+        self.chain = pd.DataFrame()
+        self.spot = None
+        self.refreshed_at = 0.0
+        self.subscribers = []
+        # Rows recomputed and seconds spent fetching and computing by the last poll.
+        self.stats = {
+            "rows": 0,
+            "recomputed": 0,
+            "fetch_seconds": 0.0,
+            "compute_seconds": 0.0,
+        }
+        self._stop = threading.Event()
+        self._thread = None
+
+    """
+    ==================================================================================================================================
+    Subscribers
+    ==================================================================================================================================
+    """
+
+    def subscribe(self, callback):
+        """
+        Call 'callback(changes)' with a ChainChanges after every poll that changed something.
+        """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self.subscribers.remove(callback)
+
+    def _publish(self, changes: ChainChanges):
+        for callback in list(self.subscribers):
+            callback(changes)
+
+    """
+    ==================================================================================================================================
+    Polling
+    ==================================================================================================================================
+    """
+
+    def poll(self, spot: float = None) -> ChainChanges:
+        """
+        Fetch the chain once, update the state and notify subscribers.
+
+        Parameters
+        ----------
+        spot : float, optional
+            Price of the underlying, by default the latest price from Yahoo.
+
+        Returns
+        -------
+        ChainChanges
+        """
+        start = time.perf_counter()
+        if spot is None:
+            spot = self.get_spot()
+        if self.expiration_date == "":
+            self.expiration_date = self.scalper.chain_loader.get_expirations(
+                self.ticker
+            )[0]
+        chain = self.scalper.chain_loader.load(self.ticker, [self.expiration_date])
+        if chain.empty:
+            # A failed request keeps the previous state.
+            return ChainChanges(pd.DataFrame(), [], pd.DataFrame(), spot, False)
+        chain = chain.drop_duplicates("contractSymbol").set_index("contractSymbol")
+        fetched = time.perf_counter()
+
+        full_refresh = (
+            self.chain.empty
+            or abs(spot / self.spot - 1) > self.underlying_tolerance
+            or time.time() - self.refreshed_at > self.full_refresh_seconds
+        )
+        # Position of every contract in the previous state, -1 for new contracts.
+        if self.chain.empty:
+            positions = np.full(len(chain), -1)
+            previous = None
+        else:
+            positions = self.chain.index.get_indexer(chain.index)
+            # Previous values aligned with 'chain' (rows of new contracts are placeholders).
+            previous = self.chain.iloc[np.maximum(positions, 0)]
+        is_new = positions == -1
+        listed = np.zeros(len(self.chain), dtype=bool)
+        listed[positions[~is_new]] = True
+        removed = self.chain.index[~listed].to_list()
+
+        if full_refresh:
+            recompute = np.ones(len(chain), dtype=bool)
+            state = self._compute(chain, spot)
+        else:
+            recompute = is_new | self._differs(chain, previous, self.quote_columns)
+            # Unchanged rows keep their previous values, only the rest is recomputed.
+            state = previous.set_axis(chain.index)
+            if recompute.any():
+                computed = self._compute(chain[recompute], spot)
+                order = np.concatenate(
+                    [np.flatnonzero(~recompute), np.flatnonzero(recompute)]
+                )
+                state = pd.concat([state[~recompute], computed])
+                state = state.iloc[np.argsort(order)]
+        updated = recompute & ~is_new
+        if full_refresh and previous is not None:
+            columns = self.quote_columns + ["sigma"] + self.scalper.greek_columns
+            updated &= self._differs(state, previous, columns)
+
+        changes = ChainChanges(
+            new=state[is_new].reset_index(),
+            removed=removed,
+            updated=state[updated].reset_index(),
+            spot=spot,
+            full_refresh=full_refresh,
+        )
+        self.chain = state
+        if full_refresh:
+            self.spot = spot
+            self.refreshed_at = time.time()
+        self.stats = {
+            "rows": len(state),
+            "recomputed": int(recompute.sum()),
+            "fetch_seconds": fetched - start,
+            "compute_seconds": time.perf_counter() - fetched,
+        }
+        if not changes.is_empty():
+            self._publish(changes)
+        return changes
+
+    def run(self, iterations: int = None):
+        """
+        Poll every 'self.interval' seconds until 'stop()' is called (or 'iterations' polls were made).
+        """
+        self._stop.clear()
+        count = 0
+        while not self._stop.is_set() and (iterations is None or count < iterations):
+            start = time.perf_counter()
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"[Chain Poller] {self.ticker}: {e}")
+            count += 1
+            self._stop.wait(max(self.interval - (time.perf_counter() - start), 0))
+
+    def start(self):
+        """
+        Run the poller in a background thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    """
+    ==================================================================================================================================
+    State
+    ==================================================================================================================================
+    """
+
+    def get_spot(self) -> float:
+        return get_provider().fetch(
+            "yahoo",
+            ("last_price", self.ticker),
+            lambda: float(yf.Ticker(self.ticker).fast_info["lastPrice"]),
+        )
+
+    def get_chain(self) -> pd.DataFrame:
+        return self.chain.reset_index()
+
+    def get_calls(self) -> pd.DataFrame:
+        return self.get_chain().query("option_type == 'call'").reset_index(drop=True)
+
+    def get_puts(self) -> pd.DataFrame:
+        return self.get_chain().query("option_type == 'put'").reset_index(drop=True)
+
+    def _compute(self, chain: pd.DataFrame, spot: float) -> pd.DataFrame:
+        r = self.scalper.get_risk_free_rate()
+        option_type = chain["option_type"].to_numpy()
+        chain = self.scalper._apply_sigma(chain.copy(), spot, r, option_type)
+        chain = self.scalper._apply_greeks(chain, spot, r, option_type)
+        chain["stockPrice"] = spot
+        return chain
+
+    def _differs(self, a: pd.DataFrame, b: pd.DataFrame, columns: list) -> np.ndarray:
+        columns = [c for c in columns if c in a.columns and c in b.columns]
+        x = a[columns].to_numpy(dtype=np.float64)
+        y = b[columns].to_numpy(dtype=np.float64)
+        same = (x == y) | (np.isnan(x) & np.isnan(y))
+        return ~same.all(axis=1)
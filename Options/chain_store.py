@@ -0,0 +1,198 @@
+import os
+import uuid
+
+# Data
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+chain_storage = "./LocalStorage/OptionChains"
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("underlying", pa.string()), ("date", pa.string())]), flavor="hive"
+)
+
+
+class ChainSnapshotStore:
+    def __init__(self, root: str = chain_storage) -> None:
+        """
+        Append-only Parquet dataset of option chain snapshots, partitioned as 'underlying=XXX/date=YYYY-MM-DD'.
+        Every snapshot is written as its own file, reads only open the partitions and columns they need.
+
+        Parameters
+        ----------
+        root : str, optional
+            Directory of the dataset, by default 'chain_storage'
+        """
+        self.root = root
+
+    def append(
+        self, chain: pd.DataFrame, underlying: str = None, snapshot_time=None
+    ) -> pd.Timestamp:
+        """
+        Write a chain as a new snapshot.
+
+        Parameters
+        ----------
+        chain : pd.DataFrame
+            Options chain, with an 'underlying' column unless 'underlying' is passed.
+        underlying : str, optional
+            Ticker of the underlying, by default the chain's 'underlying' column
+        snapshot_time : datetime-like, optional
+            Time the chain was fetched, by default now
+
+        Returns
+        -------
+        pd.Timestamp
+            The snapshot time stored in the 'snapshotTime' column.
+        """
+        if chain.empty:
+            return None
+        snapshot_time = pd.Timestamp.now() if snapshot_time is None else snapshot_time
+        snapshot_time = pd.Timestamp(snapshot_time)
+        chain = chain.copy()
+        if underlying is not None:
+            chain["underlying"] = underlying.upper()
+        chain["snapshotTime"] = snapshot_time.as_unit("us")
+        chain["date"] = snapshot_time.strftime("%Y-%m-%d")
+        # Categories are stored as plain strings, integers as floats (a column holds ints or, with NaNs, floats
+        # depending on the snapshot) and timestamps in microseconds, so every file has the same schema.
+        for column in chain.columns:
+            dtype = chain[column].dtype
+            if isinstance(dtype, pd.CategoricalDtype):
+                chain[column] = chain[column].astype(str)
+            elif pd.api.types.is_datetime64_any_dtype(dtype):
+                chain[column] = chain[column].dt.as_unit("us")
+            elif pd.api.types.is_integer_dtype(dtype):
+                chain[column] = chain[column].astype("float64")
+        table = pa.Table.from_pandas(chain, preserve_index=False)
+        ds.write_dataset(
+            table,
+            self.root,
+            format="parquet",
+            partitioning=PARTITIONING,
+            basename_template=f"{snapshot_time:%H%M%S}-{uuid.uuid4().hex[:8]}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        return snapshot_time
+
+    def load(
+        self,
+        underlying=None,
+        start_date: str = "",
+        end_date: str = "",
+        expirations: list = None,
+        columns: list = None,
+        latest: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Read snapshots. Filters are pushed down to the dataset, so only matching partitions and row groups are read.
+
+        Parameters
+        ----------
+        underlying : str or list, optional
+            Underlying(s) to read, by default every underlying
+        start_date : str, optional
+            First snapshot date to include (inclusive), by default ""
+        end_date : str, optional
+            Last snapshot date to include (inclusive), by default ""
+        expirations : list, optional
+            Expiration dates to include, by default every expiration
+        columns : list, optional
+            Columns to read, by default every column. 'underlying' and 'snapshotTime' are always included.
+        latest : bool, optional
+            Only return the most recent snapshot of each underlying, by default False
+
+        Returns
+        -------
+        pd.DataFrame
+            Matching rows, empty if nothing is stored.
+        """
+        dataset = self._get_dataset()
+        if dataset is None:
+            return pd.DataFrame()
+        where = self._get_filter(underlying, start_date, end_date, expirations)
+        if latest:
+            snapshots = self.get_snapshots(underlying, start_date, end_date)
+            if snapshots.empty:
+                return pd.DataFrame()
+            last = snapshots.groupby("underlying")["snapshotTime"].max()
+            latest_filter = None
+            for ticker, snapshot_time in last.items():
+                match = (ds.field("underlying") == ticker) & (
+                    ds.field("date") == snapshot_time.strftime("%Y-%m-%d")
+                )
+                match &= ds.field("snapshotTime") == pa.scalar(
+                    snapshot_time.as_unit("us").to_pydatetime(), pa.timestamp("us")
+                )
+                latest_filter = (
+                    match if latest_filter is None else latest_filter | match
+                )
+            where = latest_filter if where is None else where & latest_filter
+        if columns is not None:
+            columns = list(dict.fromkeys(["underlying", "snapshotTime", *columns]))
+            columns = [c for c in columns if c in dataset.schema.names]
+        table = dataset.to_table(columns=columns, filter=where)
+        return table.to_pandas()
+
+    def get_snapshots(
+        self, underlying=None, start_date: str = "", end_date: str = ""
+    ) -> pd.DataFrame:
+        """
+        Stored snapshots, one row per (underlying, snapshotTime) with its number of contracts.
+        """
+        dataset = self._get_dataset()
+        if dataset is None:
+            return pd.DataFrame(columns=["underlying", "snapshotTime", "contracts"])
+        where = self._get_filter(underlying, start_date, end_date)
+        table = dataset.to_table(columns=["underlying", "snapshotTime"], filter=where)
+        snapshots = table.group_by(["underlying", "snapshotTime"]).aggregate(
+            [("snapshotTime", "count")]
+        )
+        snapshots = snapshots.to_pandas().rename(
+            columns={"snapshotTime_count": "contracts"}
+        )
+        return snapshots.sort_values(["underlying", "snapshotTime"], ignore_index=True)
+
+    def _get_dataset(self):
+        if not os.path.isdir(self.root):
+            return None
+        dataset = ds.dataset(self.root, format="parquet", partitioning=PARTITIONING)
+        fragments = list(dataset.get_fragments())
+        if fragments == []:
+            return None
+        # Chains enriched by different classes carry different columns. Files written with int64 columns
+        # are read as float64 when another file holds floats.
+        schema = pa.unify_schemas(
+            [f.physical_schema for f in fragments] + [PARTITIONING.schema],
+            promote_options="permissive",
+        )
+        return ds.dataset(
+            self.root, schema=schema, format="parquet", partitioning=PARTITIONING
+        )
+
+    def _get_filter(
+        self, underlying=None, start_date="", end_date="", expirations=None
+    ):
+        where = None
+        conditions = []
+        if underlying is not None:
+            if isinstance(underlying, str):
+                underlying = [underlying]
+            conditions.append(
+                ds.field("underlying").isin([u.upper() for u in underlying])
+            )
+        if start_date != "":
+            conditions.append(ds.field("date") >= start_date)
+        if end_date != "":
+            conditions.append(ds.field("date") <= end_date)
+        if expirations is not None:
+            dates = pd.to_datetime(pd.Series(expirations)).dt.as_unit("us")
+            conditions.append(
+                ds.field("expirationDate").isin(
+                    pa.array(dates.to_numpy(), type=pa.timestamp("us"))
+                )
+            )
+        for condition in conditions:
+            where = condition if where is None else where & condition
+        return where
@@ -0,0 +1,127 @@
+# Data
+import numpy as np
+import pandas as pd
+
+# OCC symbols end with a fixed width suffix: YYMMDD, C/P and the strike times 1000 (8 digits).
+SUFFIX_LENGTH = 15
+OPTION_TYPES = pd.CategoricalDtype(["call", "put"])
+
+
+def days_to_expiration(expiration: pd.Series) -> pd.Series:
+    """
+    Calendar days from today to each expiration date (0 on the expiration date itself).
+    """
+    today = pd.Timestamp.now().normalize()
+    return (expiration - today).dt.days
+
+
+class ContractSymbolParser:
+    def __init__(self, max_cache_size: int = 1_000_000) -> None:
+        """
+        Vectorized parser for OCC option symbols (e.g. 'AAPL250117C00150000').
+        Parsed symbols are cached, so refreshing a chain only parses contracts that weren't seen before.
+
+        Parameters
+        ----------
+        max_cache_size : int, optional
+            Number of cached symbols after which the cache is cleared, by default 1_000_000
+        """
+        self.max_cache_size = max_cache_size
+        self.cache = self._empty_frame()
+
+    def parse(self, symbols: pd.Series) -> pd.DataFrame:
+        """
+        Split contract symbols into typed columns.
+
+        Parameters
+        ----------
+        symbols : pd.Series
+            OCC contract symbols.
+
+        Returns
+        -------
+        pd.DataFrame
+            'root' (str), 'expirationDate' (datetime64), 'option_type' (category) and 'strike' (float) columns,
+            aligned with the index of 'symbols'. Symbols that aren't OCC formatted hold missing values.
+        """
+        symbols = pd.Series(symbols)
+        # Missing and non-string symbols are cached under their text ('nan', 'None', ...), so they parse as
+        # missing values. Converted through numpy since pandas keeps missing values missing in 'astype(str)'.
+        keys = symbols.to_numpy(dtype=object).astype(str)
+        positions = self.cache.index.get_indexer(keys)
+        missing = positions == -1
+        if missing.any():
+            new = pd.unique(keys[missing])
+            if len(self.cache) + new.size > self.max_cache_size:
+                # The cleared cache must still hold the symbols of this batch that were cached before.
+                self.cache = self._empty_frame()
+                new = pd.unique(keys)
+            parsed = self._parse_new(new)
+            self.cache = pd.concat([self.cache, parsed]) if len(self.cache) else parsed
+            positions = self.cache.index.get_indexer(keys)
+        if (positions == -1).any():
+            unparsed = pd.unique(keys[positions == -1])
+            raise ValueError(f"Contract symbols couldn't be parsed: {list(unparsed)}")
+        parsed = self.cache.take(positions)
+        parsed.index = symbols.index
+        return parsed
+
+    def _parse_new(self, symbols: np.ndarray) -> pd.DataFrame:
+        # View every fixed width string as a row of unicode code points.
+        symbols = np.asarray(symbols, dtype=str)
+        width = symbols.dtype.itemsize // 4
+        codes = symbols.view(np.uint32).reshape(symbols.size, width).astype(np.int64)
+        lengths = np.char.str_len(symbols)
+        start = lengths - SUFFIX_LENGTH
+        positions = np.clip(start[:, None] + np.arange(SUFFIX_LENGTH), 0, width - 1)
+        suffix = np.take_along_axis(codes, positions, axis=1)
+
+        digits = suffix - ord("0")
+        date_digits = digits[:, :6]
+        strike_digits = digits[:, 7:]
+        flag = suffix[:, 6]
+        valid = (
+            (start > 0)
+            & ((date_digits >= 0) & (date_digits <= 9)).all(axis=1)
+            & ((strike_digits >= 0) & (strike_digits <= 9)).all(axis=1)
+            & ((flag == ord("C")) | (flag == ord("P")))
+        )
+
+        month = np.where(valid, date_digits[:, 2] * 10 + date_digits[:, 3], 0)
+        # Month 0 is out of range, so unparseable symbols become NaT.
+        dates = pd.to_datetime(
+            pd.DataFrame(
+                {
+                    "year": 2000 + date_digits[:, 0] * 10 + date_digits[:, 1],
+                    "month": month,
+                    "day": date_digits[:, 4] * 10 + date_digits[:, 5],
+                }
+            ),
+            errors="coerce",
+        )
+        strike = strike_digits @ (10 ** np.arange(7, -1, -1)) / 1000
+        option_type = pd.Categorical.from_codes(
+            np.where(valid, np.where(flag == ord("C"), 0, 1), -1),
+            dtype=OPTION_TYPES,
+        )
+        root = pd.Series(symbols).str.slice(stop=-SUFFIX_LENGTH)
+        return pd.DataFrame(
+            {
+                "root": root.where(valid).to_numpy(),
+                "expirationDate": dates.where(valid).to_numpy(),
+                "option_type": option_type,
+                "strike": np.where(valid, strike, np.nan),
+            },
+            index=pd.Index(symbols, name="contractSymbol"),
+        )
+
+    def _empty_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "root": pd.Series(dtype=object),
+                "expirationDate": pd.Series(dtype="datetime64[ns]"),
+                "option_type": pd.Series(dtype=OPTION_TYPES),
+                "strike": pd.Series(dtype=np.float64),
+            },
+            index=pd.Index([], dtype=object, name="contractSymbol"),
+        )
@@ -0,0 +1,125 @@
+# Data
+import numpy as np
+import pandas as pd
+
+
+class MoveWindows:
+    def __init__(
+        self,
+        candles: pd.DataFrame,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        changes: np.ndarray,
+    ) -> None:
+        """
+        Windows of 'candles' in which price moved past a threshold.
+        Only the start/end positions are stored, the candles of a window are sliced when it is accessed.
+
+        Parameters
+        ----------
+        candles : pd.DataFrame
+            Candles the windows were found in.
+        starts : np.ndarray
+            Position of the first candle of each window.
+        ends : np.ndarray
+            Position of the last candle of each window (inclusive).
+        changes : np.ndarray
+            Percentage change from the start to the end of each window.
+        """
+        self.candles = candles
+        self.starts = starts
+        self.ends = ends
+        self.changes = changes
+
+    def __len__(self) -> int:
+        return self.starts.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return MoveWindows(
+                self.candles,
+                self.starts[index],
+                self.ends[index],
+                self.changes[index],
+            )
+        return self.candles.iloc[self.starts[index] : self.ends[index] + 1]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        One row per window with its start/end dates and percentage change.
+        """
+        index = self.candles.index
+        return pd.DataFrame(
+            {
+                "start": index[self.starts],
+                "end": index[self.ends],
+                "change": self.changes,
+            }
+        )
+
+
+def window_changes(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Percentage change between the first and last value of every window of length 'window'.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if window < 1 or values.size < window:
+        return np.array([])
+    start = values[: values.size - window + 1]
+    end = values[window - 1 :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (end - start) / start * 100
+
+
+def scan_moves(
+    candles: pd.DataFrame,
+    values: list,
+    windows: list,
+    direction: str = "drop",
+    column: str = "Close",
+) -> dict:
+    """
+    Find every window in which price moved by at least each threshold, for several window lengths at once.
+
+    Parameters
+    ----------
+    candles : pd.DataFrame
+        Candles to scan.
+    values : list
+        Thresholds in percent (positive numbers).
+    windows : list
+        Window lengths in candles.
+    direction : str, optional
+        "drop", "rise" or "both", by default "drop"
+    column : str, optional
+        Price column to use, by default "Close"
+
+    Returns
+    -------
+    dict
+        (window, value) -> MoveWindows
+    """
+    prices = candles[column].to_numpy(dtype=np.float64)
+    thresholds = np.asarray(values, dtype=np.float64)
+    moves = {}
+    for window in windows:
+        changes = window_changes(prices, window)
+        # Thresholds x windows, one comparison for every threshold.
+        if direction == "drop":
+            hits = changes[None, :] <= -thresholds[:, None]
+        elif direction == "rise":
+            hits = changes[None, :] >= thresholds[:, None]
+        elif direction == "both":
+            hits = np.abs(changes)[None, :] >= thresholds[:, None]
+        else:
+            raise ValueError("Invalid direction. Use 'drop', 'rise' or 'both'.")
+        for value, row in zip(values, hits):
+            starts = np.flatnonzero(row)
+            moves[(window, value)] = MoveWindows(
+                candles, starts, starts + window - 1, changes[starts]
+            )
+    return moves
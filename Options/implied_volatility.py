@@ -0,0 +1,165 @@
+# Data
+import numpy as np
+
+# Pricing
+from Options.pricing import BlackScholesEngine, is_call_mask
+
+
+class ImpliedVolatility:
+    def __init__(
+        self, sigma: np.ndarray, converged: np.ndarray, iterations: np.ndarray
+    ) -> None:
+        """
+        Result of a batched implied volatility solve.
+
+        Parameters
+        ----------
+        sigma : np.ndarray
+            Implied volatility per row, NaN where the solver did not converge.
+        converged : np.ndarray
+            Boolean mask of rows that converged.
+        iterations : np.ndarray
+            Number of iterations each row needed.
+        """
+        self.sigma = sigma
+        self.converged = converged
+        self.iterations = iterations
+
+    def fill(self, fallback) -> np.ndarray:
+        """
+        Implied volatility with unconverged rows replaced by 'fallback'.
+        """
+        fallback = np.asarray(fallback, dtype=np.float64)
+        fallback = np.broadcast_to(fallback, self.sigma.shape)
+        return np.where(self.converged, self.sigma, fallback)
+
+
+class ImpliedVolatilitySolver:
+    def __init__(
+        self,
+        tolerance: float = 1e-6,
+        max_iterations: int = 50,
+        lower_sigma: float = 1e-4,
+        upper_sigma: float = 5.0,
+        min_vega: float = 1e-8,
+    ) -> None:
+        """
+        Batched implied volatility solver. Runs a Newton step on vega for every row at once and falls back to
+        bisection of a per-row bracket whenever the Newton step leaves the bracket or vega is too small.
+
+        Parameters
+        ----------
+        tolerance : float, optional
+            Absolute price error at which a row is considered converged, by default 1e-6
+        max_iterations : int, optional
+            Maximum number of iterations, by default 50
+        lower_sigma : float, optional
+            Lower bound of the volatility bracket, by default 1e-4
+        upper_sigma : float, optional
+            Upper bound of the volatility bracket, by default 5.0
+        min_vega : float, optional
+            Vega below which the Newton step is replaced by bisection, by default 1e-8
+        """
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.lower_sigma = lower_sigma
+        self.upper_sigma = upper_sigma
+        self.min_vega = min_vega
+        self.engine = BlackScholesEngine()
+
+    def solve(self, price, S, K, T, r, option_type, q=0.0) -> ImpliedVolatility:
+        """
+        Solve the implied volatility of every contract.
+
+        Parameters
+        ----------
+        price : array-like
+            Market price of the contract (usually the mark).
+        S : array-like
+            Stock price.
+        K : array-like
+            Strike price.
+        T : array-like
+            Time to expiration (in years).
+        r : array-like
+            Risk-free interest rate (annualized).
+        option_type : array-like
+            "call"/"put" strings or a boolean call mask.
+        q : array-like, optional
+            Dividend yield, by default 0.0
+
+        Returns
+        -------
+        ImpliedVolatility
+            Volatility, convergence mask and iteration counts per row.
+        """
+        price, S, K, T, r, q = np.broadcast_arrays(
+            *(np.asarray(x, dtype=np.float64) for x in (price, S, K, T, r, q))
+        )
+        is_call = np.broadcast_to(is_call_mask(option_type), price.shape)
+        n = price.size
+        price, S, K, T, r, q = (x.ravel() for x in (price, S, K, T, r, q))
+        is_call = is_call.ravel()
+
+        sigma = np.full(n, np.nan)
+        converged = np.zeros(n, dtype=bool)
+        iterations = np.zeros(n, dtype=np.int64)
+
+        # Rows outside the no-arbitrage bounds have no implied volatility.
+        with np.errstate(invalid="ignore", over="ignore"):
+            spot = S * np.exp(-q * T)
+            strike = K * np.exp(-r * T)
+            lower = np.where(
+                is_call, np.maximum(spot - strike, 0), np.maximum(strike - spot, 0)
+            )
+            upper = np.where(is_call, spot, strike)
+            solvable = (T > 0) & (S > 0) & (K > 0) & (price > lower) & (price < upper)
+        active = np.flatnonzero(solvable)
+        if active.size == 0:
+            return ImpliedVolatility(
+                sigma.reshape(price.shape),
+                converged.reshape(price.shape),
+                iterations.reshape(price.shape),
+            )
+
+        # Manaster-Koehler starting point, Newton converges monotonically from it.
+        S_a, K_a, T_a = S[active], K[active], T[active]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            carry = (r[active] - q[active]) * T_a
+            guess = np.sqrt(2 * np.abs(np.log(S_a / K_a) + carry) / T_a)
+        s = np.clip(np.nan_to_num(guess, nan=0.3), 0.05, 2.0)
+        lo = np.full(active.size, self.lower_sigma)
+        hi = np.full(active.size, self.upper_sigma)
+
+        for i in range(1, self.max_iterations + 1):
+            parts = self.engine.prepare(
+                S[active], K[active], T[active], r[active], s, q[active]
+            )
+            diff = self.engine.price_from(parts, is_call[active]) - price[active]
+            vega = S[active] * parts["disc_q"] * parts["pdf_d1"] * parts["sqrt_t"]
+            iterations[active] = i
+
+            done = np.abs(diff) < self.tolerance
+            if done.any():
+                sigma[active[done]] = s[done]
+                converged[active[done]] = True
+                keep = ~done
+                active, s, lo, hi = active[keep], s[keep], lo[keep], hi[keep]
+                diff, vega = diff[keep], vega[keep]
+                if active.size == 0:
+                    break
+
+            # Price is increasing in sigma, so the sign of the error tightens the bracket.
+            too_high = diff > 0
+            hi = np.where(too_high, s, hi)
+            lo = np.where(too_high, lo, s)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                newton = s - diff / vega
+            use_newton = (vega > self.min_vega) & (newton > lo) & (newton < hi)
+            s = np.where(use_newton, newton, 0.5 * (lo + hi))
+
+        return ImpliedVolatility(
+            sigma.reshape(price.shape),
+            converged.reshape(price.shape),
+            iterations.reshape(price.shape),
+        )
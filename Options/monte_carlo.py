@@ -0,0 +1,322 @@
+from concurrent.futures import ProcessPoolExecutor
+
+# Data
+import numpy as np
+
+# Pricing
+from Options.pricing import BlackScholesEngine, is_call_mask
+
+
+class MonteCarloEngine:
+    def __init__(
+        self,
+        paths: int = 100_000,
+        seed: int = None,
+        antithetic: bool = True,
+        chunk_size: int = 50_000,
+        jump_intensity: float = 0.0,
+        jump_mean: float = 0.0,
+        jump_std: float = 0.0,
+        workers: int = 1,
+        block_size: int = 4_000_000,
+    ) -> None:
+        """
+        Monte Carlo engine for a single underlying. Every contract is priced or revalued against the same set
+        of simulated paths, generated chunk by chunk in float32 so memory stays capped however many paths are run.
+
+        Paths follow geometric Brownian motion, with Merton log-normal jumps when 'jump_intensity' > 0.
+        They are sampled exactly at the dates that are needed (maturities or the horizon), so no time
+        discretization error is introduced.
+
+        Parameters
+        ----------
+        paths : int, optional
+            Number of simulated paths, by default 100_000
+        seed : int, optional
+            Seed of the generator. Results are reproducible for a given seed, chunk size and path count
+            regardless of the number of workers, by default None
+        antithetic : bool, optional
+            Pair every draw with its negation, by default True
+        chunk_size : int, optional
+            Paths simulated per chunk, by default 50_000
+        jump_intensity : float, optional
+            Expected number of jumps per year, by default 0.0
+        jump_mean : float, optional
+            Mean of the log jump size, by default 0.0
+        jump_std : float, optional
+            Standard deviation of the log jump size, by default 0.0
+        workers : int, optional
+            Processes used to simulate chunks in parallel, by default 1 (in process)
+        block_size : int, optional
+            Maximum (paths x contracts) elements evaluated at once, by default 4_000_000
+        """
+        # Antithetic pairs never straddle two chunks.
+        if antithetic:
+            paths += paths % 2
+            chunk_size += chunk_size % 2
+        self.paths = paths
+        self.seed = seed
+        self.antithetic = antithetic
+        self.chunk_size = chunk_size
+        self.jump_intensity = jump_intensity
+        self.jump_mean = jump_mean
+        self.jump_std = jump_std
+        self.workers = workers
+        self.block_size = block_size
+
+    def simulate(self, S: float, times, r: float, sigma: float, q: float = 0.0):
+        """
+        Simulate every path at once. Intended for inspection and small path counts,
+        'price()' and 'revalue()' never hold more than one chunk in memory.
+
+        Parameters
+        ----------
+        S : float
+            Stock price today.
+        times : array-like
+            Increasing observation times (in years).
+        r : float
+            Risk-free interest rate (annualized).
+        sigma : float
+            Volatility (annualized).
+        q : float, optional
+            Dividend yield, by default 0.0
+
+        Returns
+        -------
+        np.ndarray
+            (paths x times) float32 array of simulated prices.
+        """
+        times = np.asarray(times, dtype=np.float64)
+        tasks = self._tasks("simulate", S, times, r, sigma, q)
+        return np.concatenate([_simulate_prices(task) for task in tasks])
+
+    def price(self, S: float, K, T, r: float, sigma: float, option_type, q=0.0):
+        """
+        Price European contracts on the shared path set.
+
+        Parameters
+        ----------
+        S : float
+            Stock price.
+        K : array-like
+            Strike price.
+        T : array-like
+            Time to expiration (in years).
+        r : float
+            Risk-free interest rate (annualized).
+        sigma : float
+            Volatility of the simulated paths (annualized).
+        option_type : array-like
+            "call"/"put" strings or a boolean call mask.
+        q : float, optional
+            Dividend yield, by default 0.0
+
+        Returns
+        -------
+        dict
+            'price' and 'std_error' arrays, one value per contract.
+        """
+        K, T = np.broadcast_arrays(
+            np.asarray(K, dtype=np.float64), np.asarray(T, dtype=np.float64)
+        )
+        is_call = np.broadcast_to(is_call_mask(option_type), K.shape)
+        times, maturity_index = np.unique(np.maximum(T.ravel(), 0), return_inverse=True)
+        contracts = {
+            "K": K.ravel(),
+            "is_call": is_call.ravel(),
+            "time_index": maturity_index,
+        }
+        tasks = self._tasks("price", S, times, r, sigma, q, contracts)
+        totals, squares, samples = 0.0, 0.0, 0
+        for chunk_total, chunk_squares, chunk_samples in self._run(_price_chunk, tasks):
+            totals = totals + chunk_total
+            squares = squares + chunk_squares
+            samples += chunk_samples
+        mean = totals / samples
+        variance = np.maximum(squares / samples - mean**2, 0)
+        discount = np.exp(-r * T.ravel())
+        return {
+            "price": (discount * mean).reshape(K.shape),
+            "std_error": (discount * np.sqrt(variance / samples)).reshape(K.shape),
+        }
+
+    def revalue(
+        self,
+        S: float,
+        K,
+        T,
+        r: float,
+        sigma: float,
+        option_type,
+        quantity,
+        horizon: float,
+        q: float = 0.0,
+        contract_sigma=None,
+    ) -> np.ndarray:
+        """
+        Value of a position of contracts on every path 'horizon' years from now. Each contract is revalued with
+        Black-Scholes on the simulated price, with its remaining time to expiration.
+
+        Parameters
+        ----------
+        S, K, T, r, sigma, option_type, q
+            See 'price()'.
+        quantity : array-like
+            Number of contracts held (negative for short positions).
+        horizon : float
+            Time at which the position is revalued (in years).
+        contract_sigma : array-like, optional
+            Volatility used to revalue each contract, by default 'sigma'
+
+        Returns
+        -------
+        np.ndarray
+            Position value per path (float32).
+        """
+        K = np.asarray(K, dtype=np.float64).ravel()
+        contracts = {
+            "K": K,
+            "T": np.broadcast_to(np.asarray(T, dtype=np.float64), K.shape),
+            "is_call": np.broadcast_to(is_call_mask(option_type), K.shape),
+            "quantity": np.broadcast_to(
+                np.asarray(quantity, dtype=np.float64), K.shape
+            ),
+            "sigma": np.broadcast_to(
+                np.asarray(sigma if contract_sigma is None else contract_sigma), K.shape
+            ),
+            "horizon": horizon,
+        }
+        times = np.array([horizon], dtype=np.float64)
+        tasks = self._tasks("revalue", S, times, r, sigma, q, contracts)
+        return np.concatenate(list(self._run(_revalue_chunk, tasks)))
+
+    def _tasks(self, kind, S, times, r, sigma, q, contracts=None) -> list:
+        """
+        One task per chunk, each with its own child seed so results don't depend on the worker layout.
+        """
+        counts = [
+            min(self.chunk_size, self.paths - start)
+            for start in range(0, self.paths, self.chunk_size)
+        ]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(counts))
+        return [
+            {
+                "kind": kind,
+                "paths": count,
+                "seed": seed,
+                "antithetic": self.antithetic,
+                "S": S,
+                "times": times,
+                "r": r,
+                "sigma": sigma,
+                "q": q,
+                "jump_intensity": self.jump_intensity,
+                "jump_mean": self.jump_mean,
+                "jump_std": self.jump_std,
+                "block_size": self.block_size,
+                "contracts": contracts,
+            }
+            for count, seed in zip(counts, seeds)
+        ]
+
+    def _run(self, function, tasks):
+        if self.workers <= 1:
+            return map(function, tasks)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(function, tasks))
+
+
+"""
+==================================================================================================================================
+Workers (module level so they can be sent to a process pool)
+==================================================================================================================================
+"""
+
+
+def _simulate_prices(task: dict) -> np.ndarray:
+    """
+    Simulate one chunk of paths observed at 'task["times"]', as a (paths x times) float32 array.
+    With antithetic variates the second half of the chunk mirrors the first.
+    """
+    rng = np.random.default_rng(task["seed"])
+    paths = task["paths"]
+    times = task["times"]
+    sigma, lam = task["sigma"], task["jump_intensity"]
+    jump_mean, jump_std = task["jump_mean"], task["jump_std"]
+
+    dt = np.diff(times, prepend=0.0).astype(np.float32)
+    draws = paths // 2 if task["antithetic"] else paths
+    z = rng.standard_normal((draws, times.size), dtype=np.float32)
+    if task["antithetic"]:
+        z = np.concatenate([z, -z])
+
+    # Martingale drift, compensated for the expected jump size.
+    compensator = lam * (np.exp(jump_mean + 0.5 * jump_std**2) - 1)
+    drift = np.float32(task["r"] - task["q"] - compensator - 0.5 * sigma**2)
+    log_returns = z
+    log_returns *= np.float32(sigma) * np.sqrt(dt)
+    log_returns += drift * dt
+    if lam > 0:
+        jumps = rng.poisson(lam * dt, size=(paths, times.size)).astype(np.float32)
+        jump_z = rng.standard_normal((paths, times.size), dtype=np.float32)
+        jump_z *= np.sqrt(jumps) * np.float32(jump_std)
+        log_returns += jumps * np.float32(jump_mean) + jump_z
+    np.cumsum(log_returns, axis=1, out=log_returns)
+    np.exp(log_returns, out=log_returns)
+    log_returns *= np.float32(task["S"])
+    return log_returns
+
+
+def _pair(values: np.ndarray, antithetic: bool) -> np.ndarray:
+    """
+    Average antithetic pairs so the standard error accounts for their correlation.
+    """
+    if not antithetic:
+        return values
+    half = values.shape[0] // 2
+    return 0.5 * (values[:half] + values[half:])
+
+
+def _price_chunk(task: dict):
+    prices = _simulate_prices(task)
+    contracts = task["contracts"]
+    K, is_call, time_index = (
+        contracts["K"],
+        contracts["is_call"],
+        contracts["time_index"],
+    )
+    block = max(1, task["block_size"] // max(prices.shape[0], 1))
+    total = np.zeros(K.size)
+    squares = np.zeros(K.size)
+    samples = 0
+    for start in range(0, K.size, block):
+        cols = slice(start, start + block)
+        terminal = prices[:, time_index[cols]]
+        payoff = np.where(is_call[cols], terminal - K[cols], K[cols] - terminal)
+        payoff = _pair(np.maximum(payoff, 0), task["antithetic"])
+        total[cols] = payoff.sum(axis=0, dtype=np.float64)
+        squares[cols] = np.square(payoff, dtype=np.float64).sum(axis=0)
+        samples = payoff.shape[0]
+    return total, squares, samples
+
+
+def _revalue_chunk(task: dict) -> np.ndarray:
+    spot = _simulate_prices(task)[:, 0].astype(np.float64)
+    contracts = task["contracts"]
+    engine = BlackScholesEngine(dividend_yield=task["q"])
+    remaining = contracts["T"] - contracts["horizon"]
+    block = max(1, task["block_size"] // max(spot.size, 1))
+    value = np.zeros(spot.size)
+    for start in range(0, contracts["K"].size, block):
+        cols = slice(start, start + block)
+        prices = engine.price(
+            spot[:, None],
+            contracts["K"][cols],
+            remaining[cols],
+            task["r"],
+            contracts["sigma"][cols],
+            contracts["is_call"][cols],
+        )
+        value += prices @ contracts["quantity"][cols]
+    return value.astype(np.float32)
@@ -4,30 +4,88 @@ import numpy as np
 import pandas as pd
 from scipy.stats import norm
 
-# Stock
-import yfinance as yf
+# Pricing
+from Options.pricing import BlackScholesEngine
+from Options.implied_volatility import ImpliedVolatilitySolver
+from Options.chain_loader import ChainLoader
+from Options.risk_free_rate import get_rate_provider
+from Options.pnl_grid import PnLGrid
+from Options.chain_store import ChainSnapshotStore
+
+# Storage
+from LocalStorage.candle_store import CandleStore
 
 
 class OptionScalping:
-    def __init__(self) -> None:
+    def __init__(self, store_chains: bool = False) -> None:
         self.option_chain = pd.DataFrame()
         self.calls = pd.DataFrame()
         self.puts = pd.DataFrame()
         self.candles = pd.DataFrame()
         self.stock_price = None
         self.risk_free_rate = None
+        self.iv_solver = ImpliedVolatilitySolver()
+        self.engine = BlackScholesEngine()
+        self.chain_loader = ChainLoader()
+        self.greek_columns = [
+            "delta",
+            "gamma",
+            "vega",
+            "theta",
+            "rho",
+            "vanna",
+            "charm",
+        ]
+        self.pnl_grid = PnLGrid()
+        # Every fetched chain is appended to the snapshot store when 'store_chains' is set.
+        self.store_chains = store_chains
+        self.chain_store = ChainSnapshotStore()
+        self.candle_store = CandleStore()
+        # Incremented whenever the chain or its volatilities change, cached P&L grids are keyed on it.
+        self.chain_snapshot = 0
 
     # ---------- Options Chain ---------- #
-    def set_chain(self, ticker: str, expiration_date: str = ""):
-        stock = yf.Ticker(ticker.upper())
-        if expiration_date == "":
-            self.option_chain = stock.option_chain()
+    def set_chain(
+        self,
+        ticker: str,
+        expiration_date: str = "",
+        all_expirations: bool = False,
+        start_date: str = "",
+        end_date: str = "",
+    ):
+        if all_expirations or start_date != "" or end_date != "":
+            expirations = None
+        elif expiration_date != "":
+            expirations = [expiration_date]
         else:
-            self.option_chain = stock.option_chain(expiration_date)
+            # Nearest expiration, same as 'option_chain()' without a date.
+            expirations = self.chain_loader.get_expirations(ticker)[:1]
+        self.option_chain = self.chain_loader.load(
+            ticker, expirations, start_date=start_date, end_date=end_date
+        )
+        if self.store_chains:
+            self.chain_store.append(self.option_chain, ticker)
+        self.chain_snapshot += 1
+
+    def load_chain(self, ticker: str, date: str = "", expirations: list = None) -> bool:
+        """
+        Restore the latest stored snapshot of 'ticker' instead of fetching the chain.
+        Returns False when no snapshot is stored.
+        """
+        chain = self.chain_store.load(
+            ticker, end_date=date, expirations=expirations, latest=True
+        )
+        if chain.empty:
+            return False
+        self.option_chain = chain
+        self.calls = pd.DataFrame()
+        self.puts = pd.DataFrame()
+        self.chain_snapshot += 1
+        return True
 
     # ---------- Candles ---------- #
     def set_candles(self, ticker: str):
-        self.candles = yf.download(ticker, multi_level_index=False)
+        self.candles = self.candle_store.download(ticker, multi_level_index=False)
 
     def get_candles(self, ticker: str):
         if self.candles.empty:
@@ -46,8 +104,7 @@ class OptionScalping:
 
     # ---------- Risk Free Rate ---------- #
     def set_risk_free_rate(self, ticker: str = "^TNX"):
-        self.risk_free_rate = yf.download(ticker, multi_level_index=False)
-        self.risk_free_rate = self.risk_free_rate["Close"].iloc[-1]
+        self.risk_free_rate = get_rate_provider(ticker).get_rate()
 
     def get_risk_free_rate(self, ticker: str = "^TNX"):
         if self.risk_free_rate == None:
@@ -58,36 +115,104 @@ class OptionScalping:
     def set_calls(self, ticker: str, expiration_date: str = "") -> pd.DataFrame:
         if self.option_chain.empty:
             self.set_chain(ticker, expiration_date)
-        self.calls = self.option_chain.calls
+        self.calls = self._get_option_type(self.option_chain, "call")
 
     def get_calls(self, ticker: str, expiration_date: str = "") -> pd.DataFrame:
         if self.calls.empty:
             self.set_calls(ticker, expiration_date)
         stock_price = self.get_stock_price(ticker)
         risk_free_rate = self.get_risk_free_rate()
-        self.calls["delta"] = self.calls.apply(
-            lambda row: self.calculate_row_delta(row, stock_price, risk_free_rate),
-            axis=1,
-        )
+        self.calls = self._apply_sigma(self.calls, stock_price, risk_free_rate, "call")
+        self.calls = self._apply_greeks(self.calls, stock_price, risk_free_rate, "call")
+        self.chain_snapshot += 1
         return self.calls
 
     # ---------- Puts ---------- #
     def set_puts(self, ticker: str, expiration_date: str = ""):
         if self.option_chain.empty:
             self.set_chain(ticker, expiration_date)
-        self.puts = self.option_chain.puts
+        self.puts = self._get_option_type(self.option_chain, "put")
 
     def get_puts(self, ticker: str, expiration_date: str = ""):
         if self.puts.empty:
             self.set_puts(ticker, expiration_date)
         stock_price = self.get_stock_price(ticker)
         risk_free_rate = self.get_risk_free_rate()
-        self.puts["delta"] = self.puts.apply(
-            lambda row: self.calculate_row_delta(row, stock_price, risk_free_rate),
-            axis=1,
-        )
+        self.puts = self._apply_sigma(self.puts, stock_price, risk_free_rate, "put")
+        self.puts = self._apply_greeks(self.puts, stock_price, risk_free_rate, "put")
+        self.chain_snapshot += 1
         return self.puts
 
+    def _get_option_type(self, chain: pd.DataFrame, option_type: str):
+        return chain[chain["option_type"] == option_type].reset_index(drop=True)
+
+    # ---------- P&L ---------- #
+    def get_pnl_grid(self, ticker: str, positions: list, expiration_date: str = ""):
+        """
+        P&L of 'positions' over the spot, volatility and days forward grids of 'self.pnl_grid'.
+        Cached until the chain or its volatilities are refreshed.
+
+        Parameters
+        ----------
+        ticker : str
+            Ticker of the underlying.
+        positions : list
+            Dicts with 'contractSymbol' and 'quantity' (negative for short positions) keys, and an optional
+            'price' paid per contract (by default the contract's mark).
+        expiration_date : str, optional
+            Expiration to load when no chain is set, by default "" (nearest expiration)
+
+        Returns
+        -------
+        PnLCube
+        """
+        if "sigma" not in self.calls.columns:
+            self.get_calls(ticker, expiration_date)
+        if "sigma" not in self.puts.columns:
+            self.get_puts(ticker, expiration_date)
+        return self.pnl_grid.get(
+            pd.concat([self.calls, self.puts], ignore_index=True),
+            positions,
+            S=self.get_stock_price(ticker),
+            r=self.get_risk_free_rate(),
+            snapshot=self.chain_snapshot,
+        )
+
+    # ---------- Implied Volatility ---------- #
+    def _apply_sigma(self, df: pd.DataFrame, S: float, r: float, option_type: str):
+        """
+        Solve implied volatility from the mark for every contract at once.
+        Contracts the solver can't price keep Yahoo's 'impliedVolatility'.
+        """
+        # Contracts stop trading at the 4pm close on their expiration date.
+        expiration = df["expirationDate"] + pd.Timedelta(hours=16)
+        dte = (expiration - pd.Timestamp.now()).dt.total_seconds() / 86_400
+        df["mark"] = (df["bid"] + df["ask"]) / 2
+        df["timeToExpiration"] = dte.clip(lower=0) / 365
+        iv = self.iv_solver.solve(
+            price=df["mark"].to_numpy(),
+            S=S,
+            K=df["strike"].to_numpy(),
+            T=df["timeToExpiration"].to_numpy(),
+            r=r,
+            option_type=option_type,
+        )
+        df["sigma"] = iv.fill(df["impliedVolatility"].to_numpy())
+        df["iv_converged"] = iv.converged
+        return df
+
+    # ---------- Greeks ---------- #
+    def _apply_greeks(self, df: pd.DataFrame, S: float, r: float, option_type: str):
+        greeks = self.engine.greeks(
+            S=S,
+            K=df["strike"].to_numpy(),
+            T=df["timeToExpiration"].to_numpy(),
+            r=r,
+            sigma=df["sigma"].to_numpy(),
+            option_type=option_type,
+        )
+        return df.assign(**{c: greeks[c] for c in self.greek_columns})
+
     # ---------- Delta ---------- #
     def calculate_row_delta(self, row, S, r):
         return self.calculate_delta(
@@ -95,8 +220,8 @@ class OptionScalping:
             K=row["strike"],
             T=row["timeToExpiration"],
             r=r,
-            sigma=row["impliedVolatility"],
-            option_type="call" if "C" in row["contractSymbol"] else "put",
+            sigma=row["sigma"],
+            option_type=row["option_type"],
         )
 
     def calculate_delta(self, S, K, T, r, sigma, option_type="call"):
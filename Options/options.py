@@ -3,26 +3,68 @@ import re
 # Data
 import math
 from scipy.stats import norm
-from scipy.optimize import minimize
 import numpy as np
 import pandas as pd
 import yfinance as yf
 
+# Plotting
+import matplotlib.pyplot as plt
 
-# Date & Time
-import datetime as dt
+# Pricing
+from Options.pricing import BlackScholesEngine
+from Options.implied_volatility import ImpliedVolatilitySolver
+from Options.binomial import BinomialEngine
+from Options.chain_loader import ChainLoader
+from Options.volatility_surface import VolatilitySurface
+from Options.risk_free_rate import get_rate_provider
+from Options.historical_moves import scan_moves
+from Options.contract_symbols import days_to_expiration
+from Options.pnl_grid import PnLGrid
+from Options.chain_store import ChainSnapshotStore
+
+# Storage
+from LocalStorage.candle_store import CandleStore
 
 
 class Options:
-    def __init__(self, ticker: str, chain_date: str = "") -> None:
+    def __init__(
+        self,
+        ticker: str,
+        chain_date: str = "",
+        pricing_model: str = "black_scholes",
+        store_chains: bool = False,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        ticker : str
+            Ticker of the underlying.
+        chain_date : str, optional
+            Expiration to load, by default "" (nearest expiration)
+        pricing_model : str, optional
+            Model used for the 'model_price' column. "black_scholes" (European) or the American binomial trees
+            "crr" and "leisen_reimer", by default "black_scholes"
+        store_chains : bool, optional
+            Append every fetched chain to 'self.chain_store', by default False
+        """
         self.ticker = ticker.upper()
         self.chain_date = chain_date
+        self.pricing_model = pricing_model
         self.obj = yf.Ticker(self.ticker)
         self.options_chain = pd.DataFrame()
         self.calls = pd.DataFrame()
         self.puts = pd.DataFrame()
         self.candles = pd.DataFrame()
         self.greeks = Greeks()
+        self.engine = BlackScholesEngine()
+        self.chain_loader = ChainLoader()
+        self.volatility_surface = VolatilitySurface()
+        self.pnl_grid = PnLGrid()
+        self.store_chains = store_chains
+        self.chain_store = ChainSnapshotStore()
+        self.candle_store = CandleStore()
+        # Incremented on every chain load, cached P&L grids are keyed on it.
+        self.chain_snapshot = 0
 
         # Formats
         self.date_format = "%Y-%m-%d"
@@ -36,49 +78,117 @@ class Options:
     ==================================================================================================================================
     """
 
-    def set_options_chain(self):
-        if self.chain_date != "":
-            self.options_chain = self.obj.option_chain(self.chain_date)
+    def set_options_chain(
+        self, all_expirations: bool = False, start_date: str = "", end_date: str = ""
+    ):
+        """
+        Fetch the options chain and apply the options data.
+
+        Parameters
+        ----------
+        all_expirations : bool, optional
+            Load every listed expiration instead of only 'self.chain_date' (or the nearest), by default False
+        start_date : str, optional
+            First expiration to load, implies 'all_expirations', by default ""
+        end_date : str, optional
+            Last expiration to load, implies 'all_expirations', by default ""
+        """
+        if all_expirations or start_date != "" or end_date != "":
+            expirations = None
+        elif self.chain_date != "":
+            expirations = [self.chain_date]
         else:
-            self.options_chain = self.obj.option_chain()
-        self.calls = self.options_chain.calls
-        self.puts = self.options_chain.puts
-        self.calls["option_type"] = "call"
-        self.puts["option_type"] = "put"
-        self.options_chain = pd.concat([self.calls, self.puts]).reset_index(drop=True)
+            expirations = self.chain_loader.get_expirations(self.ticker)[:1]
+        self.options_chain = self.chain_loader.load(
+            self.ticker, expirations, start_date=start_date, end_date=end_date
+        )
+        # A new chain invalidates the fitted surface.
+        self.volatility_surface = VolatilitySurface()
+        self.chain_snapshot += 1
+        if self.options_chain.empty:
+            return
         self.options_chain = self._apply_options_data(self.options_chain)
+        if self.store_chains:
+            self.chain_store.append(self.options_chain, self.ticker)
+        self._split_options_chain()
+
+    def load_options_chain(self, date: str = "", expirations: list = None) -> bool:
+        """
+        Restore the latest stored snapshot instead of fetching the chain. Prices, volatilities and Greeks
+        are the ones of the snapshot, 'dte' is recomputed for today.
+
+        Parameters
+        ----------
+        date : str, optional
+            Latest snapshot date to consider, by default "" (most recent snapshot)
+        expirations : list, optional
+            Expirations to load, by default every stored expiration
+
+        Returns
+        -------
+        bool
+            False when no snapshot is stored.
+        """
+        chain = self.chain_store.load(
+            self.ticker, end_date=date, expirations=expirations, latest=True
+        )
+        if chain.empty:
+            return False
+        chain["dte"] = days_to_expiration(chain["expirationDate"])
+        self.options_chain = chain
+        self.volatility_surface = VolatilitySurface()
+        self.chain_snapshot += 1
+        self._split_options_chain()
+        return True
+
+    def _split_options_chain(self):
+        option_type = self.options_chain["option_type"]
+        self.calls = self.options_chain[option_type == "call"]
+        self.puts = self.options_chain[option_type == "put"]
 
     def _apply_options_data(self, option_data: pd.DataFrame):
         candles = self.get_candles()
         option_data["mark"] = (option_data["bid"] + option_data["ask"]) / 2
-        option_data["sigma"] = candles["sigma"].iloc[-1]
+        option_data["historical_sigma"] = candles["sigma"].iloc[-1]
         option_data["stockPrice"] = candles["Close"].iloc[-1]
-        option_data["expirationDate"] = option_data["contractSymbol"].apply(
-            self._apply_expiration_date
-        )
-        option_data["dte"] = option_data["expirationDate"].apply(self._apply_dte)
-        option_data["delta"] = option_data.apply(
-            lambda row: self.greeks.apply_delta(row), axis=1
-        )
-        option_data["intrinsic_value"] = option_data.apply(
-            lambda row: self._apply_intrinsic_value(row), axis=1
-        )
-        option_data["extrinsic_value"] = option_data.apply(
-            lambda row: self._apply_extrinsic_value(row), axis=1
-        )
-        option_data["extrinsic_%"] = (
-            option_data["extrinsic_value"] / option_data["intrinsic_value"]
-        ) * 100
-        option_data["extrinsic_%"] = option_data["extrinsic_%"].apply(
-            self.decimal_format.format
-        )
-        option_data["total_value"] = (
-            option_data["intrinsic_value"] + option_data["extrinsic_value"]
+        if "dte" not in option_data.columns:
+            parsed = self.chain_loader.symbol_parser.parse(
+                option_data["contractSymbol"]
+            )
+            option_data["expirationDate"] = parsed["expirationDate"]
+            option_data["dte"] = days_to_expiration(option_data["expirationDate"])
+        # Implied volatility from the mark, historical volatility where it can't be solved.
+        iv = self.greeks.iv_solver.solve(
+            price=option_data["mark"].to_numpy(),
+            S=option_data["stockPrice"].to_numpy(),
+            K=option_data["strike"].to_numpy(),
+            T=option_data["dte"].to_numpy() / 365,
+            r=self.greeks.risk_free_rate,
+            option_type=option_data["option_type"].to_numpy(),
         )
-        option_data["delta"] = option_data["delta"].apply(self.decimal_format.format)
-        option_data = option_data.apply(
-            lambda row: self.greeks._apply_black_scholes(row), axis=1
+        option_data["sigma"] = iv.fill(option_data["historical_sigma"].to_numpy())
+        option_data["iv_converged"] = iv.converged
+        columns = self.engine.enrich(
+            S=option_data["stockPrice"].to_numpy(),
+            K=option_data["strike"].to_numpy(),
+            T=option_data["dte"].to_numpy() / 365,
+            r=self.greeks.risk_free_rate,
+            sigma=option_data["sigma"].to_numpy(),
+            option_type=option_data["option_type"].to_numpy(),
+            option_price=option_data["ask"].to_numpy(),
         )
+        if self.pricing_model == "black_scholes":
+            columns["model_price"] = columns["black_scholes"]
+        else:
+            columns["model_price"] = BinomialEngine(method=self.pricing_model).price(
+                S=option_data["stockPrice"].to_numpy(),
+                K=option_data["strike"].to_numpy(),
+                T=option_data["dte"].to_numpy() / 365,
+                r=self.greeks.risk_free_rate,
+                sigma=option_data["sigma"].to_numpy(),
+                option_type=option_data["option_type"].to_numpy(),
+            )
+        option_data = option_data.assign(**columns)
         return option_data
 
     def get_options_chain(self):
@@ -89,16 +199,57 @@ class Options:
     def get_calls(self):
         if self.options_chain.empty:
             self.set_options_chain()
-        return self.options_chain.calls
+        return self.options_chain[self.options_chain["option_type"] == "call"]
 
     def get_puts(self):
         if self.options_chain.empty:
             self.set_options_chain()
-        return self.options_chain.puts
+        return self.options_chain[self.options_chain["option_type"] == "put"]
+
+    def set_volatility_surface(self):
+        """
+        Fit the volatility surface. Loads every expiration when the current chain has fewer than two.
+        """
+        if (
+            self.options_chain.empty
+            or self.options_chain["expirationDate"].nunique() < 2
+        ):
+            self.set_options_chain(all_expirations=True)
+        self.volatility_surface.fit(self.options_chain)
+
+    def get_volatility_surface(self) -> VolatilitySurface:
+        if not self.volatility_surface.is_fitted():
+            self.set_volatility_surface()
+        return self.volatility_surface
+
+    def get_pnl_grid(self, positions: list):
+        """
+        P&L of 'positions' over the spot, volatility and days forward grids of 'self.pnl_grid'.
+        Cached until the chain is reloaded.
+
+        Parameters
+        ----------
+        positions : list
+            Dicts with 'contractSymbol' and 'quantity' (negative for short positions) keys, and an optional
+            'price' paid per contract (by default the contract's mark).
+
+        Returns
+        -------
+        PnLCube
+        """
+        chain = self.get_options_chain()
+        return self.pnl_grid.get(
+            chain,
+            positions,
+            S=chain["stockPrice"].iloc[0],
+            r=self.greeks.risk_free_rate,
+            snapshot=self.chain_snapshot,
+        )
 
     def set_candles(self, period: str = "1y"):
-        self.candles = yf.download(self.ticker, period=period)
-        self.candles.columns = self.candles.columns.droplevel(1)
+        self.candles = self.candle_store.download(
+            self.ticker, period=period, multi_level_index=False
+        )
         prices = self.candles["Close"].to_list()
         log_returns = np.log(np.array(prices[1:]) / np.array(prices[:-1]))
         # Standard deviation of daily log returns
@@ -139,47 +290,29 @@ class Options:
         return diff
 
     def find_historical_correlation(self, value: float, window: int, option_type: str):
+        """
+        Find the windows of 'window' candles in which price moved at least 'value' percent in the option
+        holder's favour: drops for puts, rises for calls.
 
-        df = self.get_candles()
-        drop_windows = []
-        column = "Close"
-        for i in range(len(df) - window + 1):
-            start_value = df[column].iloc[i]
-            end_value = df[column].iloc[i + window - 1]
-            percentage_change = ((end_value - start_value) / start_value) * 100
-            if option_type == "put":
-                if percentage_change <= -value:
-                    drop_windows.append(df.iloc[i : i + window])
-                elif percentage_change >= value:
-                    drop_windows.append(df.iloc[i : i + window])
-        return drop_windows
-
-    def _apply_intrinsic_value(self, row: pd.Series):
-        S = row["stockPrice"]
-        K = row["strike"]
-        option_type = row["option_type"]
-        if option_type == "call":
-            intrinsic = max(S - K, 0)  # Assing 0 if S - K < 0
-        elif option_type == "put":
-            intrinsic = max(K - S, 0)
-        return intrinsic
-
-    def _apply_extrinsic_value(self, row: pd.Series):
-        option_price = row["ask"]
-        intrinsic = row["intrinsic_value"]
-        extrinsic = option_price - intrinsic
-        return extrinsic
-
-    def _apply_expiration_date(self, contract_symbol: str):
-        data = self.parse_contract_symbol(contract_symbol, return_tuple=True)
-        date = data[1]
-        return date
-
-    def _apply_dte(self, date: str):
-        current_date = dt.datetime.now()
-        date_obj = dt.datetime.strptime(date, self.date_format)
-        delta = date_obj - current_date
-        return delta.days
+        Returns
+        -------
+        MoveWindows
+            Start/end positions of the windows, candles are sliced lazily when a window is accessed.
+        """
+        moves = self.scan_historical_moves([value], [window], option_type)
+        return moves[(window, value)]
+
+    def scan_historical_moves(self, values: list, windows: list, option_type: str):
+        """
+        Run 'find_historical_correlation()' for every combination of thresholds and window lengths at once.
+
+        Returns
+        -------
+        dict
+            (window, value) -> MoveWindows
+        """
+        direction = "drop" if option_type == "put" else "rise"
+        return scan_moves(self.get_candles(), values, windows, direction=direction)
 
     def parse_contract_symbol(self, contract_symbol, return_tuple: bool = False):
         # Regular expression
@@ -207,8 +340,17 @@ class Options:
     ==================================================================================================================================
     """
 
-    def plot_volatility_surface(self):
-        pass
+    def plot_volatility_surface(self, figsize: tuple = (10, 7)):
+        surface = self.get_volatility_surface()
+        moneyness, dte = np.meshgrid(surface.moneyness, surface.dte)
+        fig = plt.figure(figsize=figsize)
+        ax = fig.add_subplot(projection="3d")
+        ax.plot_surface(moneyness, dte, surface.iv_grid * 100, cmap="viridis")
+        ax.set_title(f"{self.ticker} Volatility Surface")
+        ax.set_xlabel("Moneyness (Strike / Spot)")
+        ax.set_ylabel("DTE")
+        ax.set_zlabel("IV (%)")
+        plt.show()
 
 
 class Greeks:
@@ -219,12 +361,11 @@ class Greeks:
             self.risk_free_rate = self.get_risk_free_rate()
         else:
             self.risk_free_rate = risk_free_rate
+        self.iv_solver = ImpliedVolatilitySolver()
+        self.engine = BlackScholesEngine()
 
     def get_risk_free_rate(self) -> float:
-        ticker = "^TNX"
-        data = yf.download(ticker)
-        data.columns = data.columns.droplevel(1)
-        return data["Close"].iloc[-1] / 100
+        return get_rate_provider().get_rate()
 
     def get_delta(self, S, K, T, r, sigma, option_type):
         """
@@ -271,39 +412,60 @@ class Greeks:
         T = option_data["dte"] / 365
         r = self.risk_free_rate
         sigma = option_data["sigma"]
-
-        new_sigma = self.get_implied_sigma(
-            S, K, T, r, sigma, q=0, option_type=option_type
-        )
-        # print(f"S: {S}   K: {K}  T: {T}  R: {r}  SIGMA: {sigma}  NEW: {new_sigma}")
         delta = self.get_delta(S, K, T, r, sigma, option_type)
         return delta
 
-    def get_implied_sigma(self, S, K, T, r, sigma, q, option_type):
-        result = minimize(
-            self.objective_function,
-            sigma,
-            args=(S, K, T, r, q, option_type),
-            bounds=[(0.01, 3.0)],
+    def compute_all(self, chain: pd.DataFrame, r: float = None) -> np.ndarray:
+        """
+        Compute the price and every first and second order Greek for an entire chain at once.
+
+        Parameters
+        ----------
+        chain : pd.DataFrame
+            Options chain with 'stockPrice', 'strike', 'sigma', 'option_type' and either
+            'timeToExpiration' (years) or 'dte' (days) columns.
+        r : float, optional
+            Risk-free rate, by default 'self.risk_free_rate'
+
+        Returns
+        -------
+        np.ndarray
+            Structured array (see 'GREEKS_DTYPE') aligned with the rows of 'chain'.
+        """
+        if r is None:
+            r = self.risk_free_rate
+        if "timeToExpiration" in chain.columns:
+            T = chain["timeToExpiration"].to_numpy(dtype=np.float64)
+        else:
+            T = chain["dte"].to_numpy(dtype=np.float64) / 365
+        return self.engine.greeks(
+            S=chain["stockPrice"].to_numpy(dtype=np.float64),
+            K=chain["strike"].to_numpy(dtype=np.float64),
+            T=T,
+            r=r,
+            sigma=chain["sigma"].to_numpy(dtype=np.float64),
+            option_type=chain["option_type"].to_numpy(),
         )
-        iv = result.x[0]
-        return iv
 
-    def objective_function(self, sigma, S, K, T, r, q, option_type: str):
-        model_price = self.black_scholes(S, K, T, r, sigma, q, option_type)
-        return (model_price - S) ** 2
+    def get_implied_sigma(self, option_price, S, K, T, r, q=0, option_type="call"):
+        """
+        Implied volatility of the option from its market price.
+        Accepts scalars or arrays, returns NaN where the price has no implied volatility.
+        """
+        iv = self.iv_solver.solve(option_price, S, K, T, r, option_type, q=q)
+        return iv.sigma
 
     def _apply_black_scholes(self, row: pd.Series):
-        print(f"ROW: {row}")
-
         bs = self.black_scholes(
             row["stockPrice"],
             K=row["strike"],
             T=row["dte"] / 365,
-            r=0.0465,
+            r=self.risk_free_rate,
             sigma=row["sigma"],
             q=0,
+            option_type=row["option_type"],
         )
+        return bs
 
     def black_scholes(self, S, K, T, r, sigma, q, option_type="call"):
         d1 = (np.log(S / K) + (r - q + (sigma**2) / 2) * T) / (sigma * np.sqrt(T))
@@ -0,0 +1,215 @@
+from collections import OrderedDict
+
+# Data
+import numpy as np
+import pandas as pd
+
+# Pricing
+from Options.pricing import BlackScholesEngine
+
+CONTRACT_MULTIPLIER = 100
+
+
+class PnLCube:
+    def __init__(
+        self,
+        spot: np.ndarray,
+        spot_shocks: np.ndarray,
+        vol_shocks: np.ndarray,
+        days_forward: np.ndarray,
+        pnl: np.ndarray,
+        leg_pnl: np.ndarray,
+        symbols: list,
+    ) -> None:
+        """
+        Profit and loss of a position over a (spot x volatility x days forward) grid.
+
+        Parameters
+        ----------
+        spot : np.ndarray
+            Price of the underlying at every spot shock.
+        spot_shocks : np.ndarray
+            Relative spot moves, 0.05 is +5%.
+        vol_shocks : np.ndarray
+            Absolute implied volatility moves, 0.05 is +5 vol points.
+        days_forward : np.ndarray
+            Calendar days from now.
+        pnl : np.ndarray
+            (spot x vol x days) P&L of the whole position in dollars.
+        leg_pnl : np.ndarray
+            (spot x vol x days x legs) P&L of every leg in dollars.
+        symbols : list
+            Contract symbol of every leg.
+        """
+        self.spot = spot
+        self.spot_shocks = spot_shocks
+        self.vol_shocks = vol_shocks
+        self.days_forward = days_forward
+        self.pnl = pnl
+        self.leg_pnl = leg_pnl
+        self.symbols = symbols
+
+    def worst(self) -> float:
+        return float(np.nanmin(self.pnl))
+
+    def best(self) -> float:
+        return float(np.nanmax(self.pnl))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        One row per grid point.
+        """
+        spot, vol, days = np.indices(self.pnl.shape).reshape(3, -1)
+        return pd.DataFrame(
+            {
+                "spot_shock": self.spot_shocks[spot],
+                "stockPrice": self.spot[spot],
+                "vol_shock": self.vol_shocks[vol],
+                "days_forward": self.days_forward[days],
+                "pnl": self.pnl.ravel(),
+            }
+        )
+
+
+class PnLGrid:
+    def __init__(
+        self,
+        spot_shocks=np.linspace(-0.2, 0.2, 41),
+        vol_shocks=np.linspace(-0.1, 0.1, 5),
+        days_forward=[0, 1, 7, 30],
+        engine: BlackScholesEngine = None,
+        max_cache_size: int = 64,
+    ) -> None:
+        """
+        Scenario P&L of option positions. Every leg is priced at every grid point in one broadcast
+        Black-Scholes pass, and results are cached per (chain snapshot, positions).
+
+        Parameters
+        ----------
+        spot_shocks : array-like, optional
+            Relative spot moves, by default -20% to +20% in 1% steps
+        vol_shocks : array-like, optional
+            Absolute implied volatility moves, by default -10 to +10 vol points
+        days_forward : array-like, optional
+            Calendar days from now, by default [0, 1, 7, 30]
+        engine : BlackScholesEngine, optional
+            Pricer, by default a BlackScholesEngine without dividends
+        max_cache_size : int, optional
+            Number of cubes kept, least recently used first out, by default 64
+        """
+        self.spot_shocks = np.asarray(spot_shocks, dtype=np.float64)
+        self.vol_shocks = np.asarray(vol_shocks, dtype=np.float64)
+        self.days_forward = np.asarray(days_forward, dtype=np.float64)
+        self.engine = BlackScholesEngine() if engine is None else engine
+        self.max_cache_size = max_cache_size
+        self.cache = OrderedDict()
+
+    def get(
+        self, chain: pd.DataFrame, positions: list, S: float, r: float, snapshot=None
+    ) -> PnLCube:
+        """
+        P&L cube of 'positions', cached per 'snapshot'.
+
+        Parameters
+        ----------
+        chain : pd.DataFrame
+            Options chain with 'contractSymbol', 'strike', 'option_type', 'sigma', 'mark' and either
+            'timeToExpiration' (years) or 'dte' (days) columns.
+        positions : list
+            Dicts with 'contractSymbol' and 'quantity' (negative for short positions) keys, and an optional
+            'price' paid per contract (by default the contract's mark).
+        S : float
+            Price of the underlying.
+        r : float
+            Risk-free interest rate (annualized).
+        snapshot : hashable, optional
+            Identifies the state of 'chain'. Nothing is cached when None.
+
+        Returns
+        -------
+        PnLCube
+        """
+        if snapshot is None:
+            return self.compute(chain, positions, S, r)
+        key = (snapshot, self._positions_key(positions), S, r, self._grid_key())
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        cube = self.compute(chain, positions, S, r)
+        self.cache[key] = cube
+        if len(self.cache) > self.max_cache_size:
+            self.cache.popitem(last=False)
+        return cube
+
+    def compute(
+        self, chain: pd.DataFrame, positions: list, S: float, r: float
+    ) -> PnLCube:
+        """
+        Uncached P&L cube, see 'get()'.
+        """
+        legs = self._get_legs(chain, positions)
+        if "timeToExpiration" in legs.columns:
+            T = legs["timeToExpiration"].to_numpy(dtype=np.float64)
+        else:
+            T = legs["dte"].to_numpy(dtype=np.float64) / 365
+        sigma = legs["sigma"].to_numpy(dtype=np.float64)
+
+        # Axes: spot, vol, days, legs.
+        spot = S * (1 + self.spot_shocks)
+        shocked_sigma = np.maximum(sigma + self.vol_shocks[:, None], 1e-4)
+        remaining = np.maximum(T - self.days_forward[:, None] / 365, 0)
+        values = self.engine.price(
+            S=spot[:, None, None, None],
+            K=legs["strike"].to_numpy(dtype=np.float64),
+            T=remaining[None, None, :, :],
+            r=r,
+            sigma=shocked_sigma[None, :, None, :],
+            option_type=legs["option_type"].to_numpy(),
+        )
+        quantity = legs["quantity"].to_numpy(dtype=np.float64)
+        leg_pnl = (values - legs["price"].to_numpy(dtype=np.float64)) * (
+            quantity * CONTRACT_MULTIPLIER
+        )
+        return PnLCube(
+            spot=spot,
+            spot_shocks=self.spot_shocks,
+            vol_shocks=self.vol_shocks,
+            days_forward=self.days_forward,
+            pnl=leg_pnl.sum(axis=-1),
+            leg_pnl=leg_pnl,
+            symbols=legs["contractSymbol"].to_list(),
+        )
+
+    def clear(self):
+        self.cache.clear()
+
+    def _get_legs(self, chain: pd.DataFrame, positions: list) -> pd.DataFrame:
+        positions = pd.DataFrame(
+            positions, columns=["contractSymbol", "quantity", "price"]
+        )
+        symbols = chain["contractSymbol"]
+        first = np.flatnonzero(~symbols.duplicated().to_numpy())
+        rows = pd.Index(symbols.to_numpy()[first]).get_indexer(
+            positions["contractSymbol"]
+        )
+        missing = rows == -1
+        if missing.any():
+            raise KeyError(
+                f"Contracts not in the chain: {positions.loc[missing, 'contractSymbol'].to_list()}"
+            )
+        legs = chain.iloc[first[rows]].reset_index(drop=True)
+        legs["quantity"] = positions["quantity"].to_numpy()
+        legs["price"] = positions["price"].fillna(legs["mark"]).to_numpy()
+        return legs
+
+    def _positions_key(self, positions: list) -> tuple:
+        return tuple(
+            (p["contractSymbol"], p["quantity"], p.get("price")) for p in positions
+        )
+
+    def _grid_key(self) -> tuple:
+        return (
+            self.spot_shocks.tobytes(),
+            self.vol_shocks.tobytes(),
+            self.days_forward.tobytes(),
+        )
@@ -0,0 +1,235 @@
+# Data
+import numpy as np
+from scipy.special import ndtr
+
+SQRT_2PI = np.sqrt(2 * np.pi)
+
+# Theta and charm are per year, vega/rho/vanna/vomma per 1.00 change in volatility or rate.
+GREEKS_DTYPE = np.dtype(
+    [
+        ("price", np.float64),
+        ("delta", np.float64),
+        ("gamma", np.float64),
+        ("vega", np.float64),
+        ("theta", np.float64),
+        ("rho", np.float64),
+        ("vanna", np.float64),
+        ("charm", np.float64),
+        ("vomma", np.float64),
+    ]
+)
+
+
+def is_call_mask(option_type) -> np.ndarray:
+    """
+    Convert option types into a boolean mask where True marks a call.
+
+    Parameters
+    ----------
+    option_type : array-like
+        Either booleans (True for calls) or strings "call"/"put".
+
+    Returns
+    -------
+    np.ndarray
+        Boolean array, True for calls.
+    """
+    option_type = np.asarray(option_type)
+    if option_type.dtype == bool:
+        return option_type
+    return option_type == "call"
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+
+class BlackScholesEngine:
+    def __init__(self, dividend_yield: float = 0.0) -> None:
+        """
+        Columnar Black-Scholes engine. Every input can be a scalar or a NumPy array,
+        arrays are broadcast against each other so an entire options chain is priced in one pass.
+
+        Parameters
+        ----------
+        dividend_yield : float, optional
+            Continuous dividend yield used when 'q' is not passed, by default 0.0
+        """
+        self.dividend_yield = dividend_yield
+
+    def prepare(self, S, K, T, r, sigma, q=None) -> dict:
+        """
+        Compute the intermediates shared by the price and every Greek.
+        Rows with a non-positive price, strike, time or volatility are marked invalid and hold NaN.
+
+        Parameters
+        ----------
+        S : array-like
+            Stock price.
+        K : array-like
+            Strike price.
+        T : array-like
+            Time to expiration (in years).
+        r : array-like
+            Risk-free interest rate (annualized).
+        sigma : array-like
+            Volatility (annualized).
+        q : array-like, optional
+            Dividend yield, by default 'self.dividend_yield'
+
+        Returns
+        -------
+        dict
+            Broadcast inputs and the d1/d2, pdf/cdf and discount factor arrays.
+        """
+        if q is None:
+            q = self.dividend_yield
+        inputs = [np.asarray(x, dtype=np.float64) for x in (S, K, T, r, sigma, q)]
+        shape = np.broadcast_shapes(*(x.shape for x in inputs))
+        S, K, T, r, sigma, q = inputs
+        # Intermediates keep the shape of their own inputs, so grids built from
+        # broadcast axes (spot x vol x time) only pay full size for d1 onwards.
+        valid = (S > 0) & (K > 0) & (T > 0) & (sigma > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sqrt_t = np.sqrt(T)
+            vol_sqrt_t = sigma * sqrt_t
+            d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / vol_sqrt_t
+        d1 = np.where(np.broadcast_to(valid, shape), d1, np.nan)
+        d2 = d1 - vol_sqrt_t
+        return {
+            "S": np.broadcast_to(S, shape),
+            "K": np.broadcast_to(K, shape),
+            "T": np.broadcast_to(T, shape),
+            "r": np.broadcast_to(r, shape),
+            "sigma": np.broadcast_to(sigma, shape),
+            "q": np.broadcast_to(q, shape),
+            "valid": np.broadcast_to(valid, shape),
+            "sqrt_t": np.broadcast_to(sqrt_t, shape),
+            "d1": d1,
+            "d2": d2,
+            "pdf_d1": norm_pdf(d1),
+            "cdf_d1": ndtr(d1),
+            "cdf_d2": ndtr(d2),
+            "disc_r": np.broadcast_to(np.exp(-r * T), shape),
+            "disc_q": np.broadcast_to(np.exp(-q * T), shape),
+        }
+
+    def intrinsic_value(self, S, K, option_type) -> np.ndarray:
+        is_call = is_call_mask(option_type)
+        S = np.asarray(S, dtype=np.float64)
+        K = np.asarray(K, dtype=np.float64)
+        return np.where(is_call, np.maximum(S - K, 0), np.maximum(K - S, 0))
+
+    def price_from(self, parts: dict, option_type) -> np.ndarray:
+        """
+        Black-Scholes price from intermediates created by 'prepare()'.
+        Expired contracts are worth their intrinsic value.
+        """
+        is_call = is_call_mask(option_type)
+        S, K = parts["S"], parts["K"]
+        spot = S * parts["disc_q"]
+        strike = K * parts["disc_r"]
+        call = spot * parts["cdf_d1"] - strike * parts["cdf_d2"]
+        put = strike * (1 - parts["cdf_d2"]) - spot * (1 - parts["cdf_d1"])
+        price = np.where(is_call, call, put)
+        expired = parts["T"] <= 0
+        if expired.any():
+            price = np.where(expired, self.intrinsic_value(S, K, is_call), price)
+        return price
+
+    def delta_from(self, parts: dict, option_type) -> np.ndarray:
+        is_call = is_call_mask(option_type)
+        cdf_d1 = parts["cdf_d1"]
+        return parts["disc_q"] * np.where(is_call, cdf_d1, cdf_d1 - 1)
+
+    def greeks_from(self, parts: dict, option_type) -> np.ndarray:
+        """
+        Price and every first and second order Greek from intermediates created by 'prepare()'.
+
+        Returns
+        -------
+        np.ndarray
+            Structured array with 'GREEKS_DTYPE' fields, one record per row.
+        """
+        is_call = is_call_mask(option_type)
+        S, K, T, r, q, sigma = (
+            parts["S"],
+            parts["K"],
+            parts["T"],
+            parts["r"],
+            parts["q"],
+            parts["sigma"],
+        )
+        d1, d2 = parts["d1"], parts["d2"]
+        pdf_d1, cdf_d1, cdf_d2 = parts["pdf_d1"], parts["cdf_d1"], parts["cdf_d2"]
+        disc_r, disc_q, sqrt_t = parts["disc_r"], parts["disc_q"], parts["sqrt_t"]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vol_sqrt_t = sigma * sqrt_t
+            spot_pdf = S * disc_q * pdf_d1
+            # N(d) for calls, N(d) - 1 == -N(-d) for puts
+            n_d1 = np.where(is_call, cdf_d1, cdf_d1 - 1)
+            n_d2 = np.where(is_call, cdf_d2, cdf_d2 - 1)
+            vega = spot_pdf * sqrt_t
+            charm_drift = (2 * (r - q) * T - d2 * vol_sqrt_t) / (2 * T * vol_sqrt_t)
+
+            greeks = np.empty(S.shape, dtype=GREEKS_DTYPE)
+            greeks["price"] = self.price_from(parts, is_call)
+            greeks["delta"] = disc_q * n_d1
+            greeks["gamma"] = disc_q * pdf_d1 / (S * vol_sqrt_t)
+            greeks["vega"] = vega
+            greeks["theta"] = (
+                -spot_pdf * sigma / (2 * sqrt_t)
+                - r * K * disc_r * n_d2
+                + q * S * disc_q * n_d1
+            )
+            greeks["rho"] = K * T * disc_r * n_d2
+            greeks["vanna"] = -disc_q * pdf_d1 * d2 / sigma
+            greeks["charm"] = q * disc_q * n_d1 - disc_q * pdf_d1 * charm_drift
+            greeks["vomma"] = vega * d1 * d2 / sigma
+        return greeks
+
+    def greeks(self, S, K, T, r, sigma, option_type, q=None) -> np.ndarray:
+        parts = self.prepare(S, K, T, r, sigma, q)
+        return self.greeks_from(parts, option_type)
+
+    def price(self, S, K, T, r, sigma, option_type, q=None) -> np.ndarray:
+        parts = self.prepare(S, K, T, r, sigma, q)
+        return self.price_from(parts, option_type)
+
+    def delta(self, S, K, T, r, sigma, option_type, q=None) -> np.ndarray:
+        parts = self.prepare(S, K, T, r, sigma, q)
+        return self.delta_from(parts, option_type)
+
+    def enrich(self, S, K, T, r, sigma, option_type, option_price, q=None) -> dict:
+        """
+        Compute every analytics column of an options chain in a single pass.
+
+        Parameters
+        ----------
+        S, K, T, r, sigma : array-like
+            See 'prepare()'.
+        option_type : array-like
+            "call"/"put" strings or a boolean call mask.
+        option_price : array-like
+            Price paid for the contract, used for the extrinsic value.
+
+        Returns
+        -------
+        dict
+            Column name -> NumPy array, ready to be assigned to the chain.
+        """
+        is_call = is_call_mask(option_type)
+        parts = self.prepare(S, K, T, r, sigma, q)
+        intrinsic = self.intrinsic_value(parts["S"], parts["K"], is_call)
+        extrinsic = np.asarray(option_price, dtype=np.float64) - intrinsic
+        with np.errstate(divide="ignore", invalid="ignore"):
+            extrinsic_pct = (extrinsic / intrinsic) * 100
+        return {
+            "delta": self.delta_from(parts, is_call),
+            "intrinsic_value": intrinsic,
+            "extrinsic_value": extrinsic,
+            "extrinsic_%": extrinsic_pct,
+            "total_value": intrinsic + extrinsic,
+            "black_scholes": self.price_from(parts, is_call),
+        }
@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import threading
+
+# Stock
+import yfinance as yf
+
+# Data providers
+from DataProviders.provider import get_provider
+
+rate_cache_path = "./LocalStorage/Cache/risk_free_rate.json"
+
+
+class RiskFreeRate:
+    def __init__(
+        self,
+        ticker: str = "^TNX",
+        ttl: float = 6 * 60 * 60,
+        cache_path: str = rate_cache_path,
+        period: str = "5d",
+        retry_delay: float = 60.0,
+    ) -> None:
+        """
+        Risk-free rate memoized in memory and on disk. Only a short recent window of 'ticker' is downloaded
+        once the cached value is older than 'ttl'.
+
+        Parameters
+        ----------
+        ticker : str, optional
+            Yield ticker quoted in percent, by default "^TNX"
+        ttl : float, optional
+            Seconds a fetched rate stays valid, by default 6 hours
+        cache_path : str, optional
+            JSON file shared by every process, by default 'rate_cache_path'
+        period : str, optional
+            Window downloaded when refreshing, by default "5d"
+        retry_delay : float, optional
+            Seconds a stale rate is served after a failed download before downloading again, by default 60.0
+        """
+        self.ticker = ticker
+        self.ttl = ttl
+        self.cache_path = cache_path
+        self.period = period
+        self.retry_delay = retry_delay
+        self.rate = None
+        self.fetched_at = 0.0
+        self.retry_at = 0.0
+        self.lock = threading.Lock()
+
+    def get_rate(self) -> float:
+        with self.lock:
+            if self.rate is not None and (
+                self._is_fresh(self.fetched_at) or time.time() < self.retry_at
+            ):
+                return self.rate
+            cached = self._read_cache()
+            if cached is not None and self._is_fresh(cached["fetched_at"]):
+                self.rate = cached["rate"]
+                self.fetched_at = cached["fetched_at"]
+                return self.rate
+            try:
+                rate = self._fetch_rate()
+            except Exception:
+                # A stale rate (the newer of memory and disk) beats no rate when the download fails.
+                if cached is not None and (
+                    self.rate is None or cached["fetched_at"] > self.fetched_at
+                ):
+                    self.rate = cached["rate"]
+                    self.fetched_at = cached["fetched_at"]
+                if self.rate is None:
+                    raise
+                self.retry_at = time.time() + self.retry_delay
+                return self.rate
+            self.rate = rate
+            self.fetched_at = time.time()
+            self._write_cache()
+            return self.rate
+
+    def invalidate(self):
+        with self.lock:
+            self.rate = None
+            self.fetched_at = 0.0
+            self.retry_at = 0.0
+
+    def _is_fresh(self, fetched_at: float) -> bool:
+        return time.time() - fetched_at < self.ttl
+
+    def _fetch_rate(self) -> float:
+        data = get_provider().fetch(
+            "yahoo",
+            ("download", self.ticker, self.period),
+            yf.download,
+            self.ticker,
+            period=self.period,
+            multi_level_index=False,
+            progress=False,
+        )
+        return float(data["Close"].dropna().iloc[-1]) / 100
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_path, "r") as file:
+                return json.load(file).get(self.ticker)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_cache(self):
+        try:
+            with open(self.cache_path, "r") as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        data[self.ticker] = {"rate": self.rate, "fetched_at": self.fetched_at}
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with open(self.cache_path, "w") as file:
+            json.dump(data, file)
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_rate_provider(ticker: str = "^TNX", ttl: float = None) -> RiskFreeRate:
+    """
+    Process-wide provider for 'ticker'. Passing 'ttl' updates the provider's TTL.
+    """
+    with _providers_lock:
+        if ticker not in _providers:
+            _providers[ticker] = RiskFreeRate(ticker)
+        provider = _providers[ticker]
+    if ttl is not None:
+        provider.ttl = ttl
+    return provider
@@ -0,0 +1,147 @@
+# Data
+import numpy as np
+import pandas as pd
+
+# Pricing
+from Options.pricing import is_call_mask
+
+
+class VolatilitySurface:
+    def __init__(
+        self,
+        min_moneyness: float = 0.5,
+        max_moneyness: float = 1.5,
+        moneyness_points: int = 41,
+        dte_points: int = 40,
+    ) -> None:
+        """
+        Implied volatility surface on a regular (moneyness, DTE) grid.
+        The grid is fitted once, lookups afterwards are O(1) bilinear interpolation.
+
+        Parameters
+        ----------
+        min_moneyness : float, optional
+            Lowest strike / spot on the grid, by default 0.5
+        max_moneyness : float, optional
+            Highest strike / spot on the grid, by default 1.5
+        moneyness_points : int, optional
+            Number of grid points along the moneyness axis, by default 41
+        dte_points : int, optional
+            Number of grid points along the DTE axis, by default 40
+        """
+        self.moneyness = np.linspace(min_moneyness, max_moneyness, moneyness_points)
+        self.dte_points = dte_points
+        self.dte = np.array([])
+        self.iv_grid = np.empty((0, moneyness_points))
+        self.spot = np.nan
+
+    def is_fitted(self) -> bool:
+        return self.iv_grid.size > 0
+
+    def fit(self, chain: pd.DataFrame, spot: float = None):
+        """
+        Fit the grid from an options chain.
+
+        Out of the money contracts (puts below spot, calls above) are interpolated across strikes for every
+        expiration, then total variance is interpolated linearly between expirations.
+
+        Parameters
+        ----------
+        chain : pd.DataFrame
+            Options chain with 'strike', 'dte', 'sigma', 'option_type' and 'stockPrice' columns.
+            Rows with 'iv_converged' False are ignored when the column exists.
+        spot : float, optional
+            Price of the underlying, by default the chain's 'stockPrice'
+
+        Returns
+        -------
+        VolatilitySurface
+            The fitted surface (self).
+        """
+        if spot is None:
+            spot = chain["stockPrice"].iloc[0]
+        strike = chain["strike"].to_numpy(dtype=np.float64)
+        sigma = chain["sigma"].to_numpy(dtype=np.float64)
+        dte = chain["dte"].to_numpy(dtype=np.float64)
+        is_call = is_call_mask(chain["option_type"].to_numpy())
+        keep = (sigma > 0) & (dte > 0) & (is_call == (strike >= spot))
+        if "iv_converged" in chain.columns:
+            keep &= chain["iv_converged"].to_numpy(dtype=bool)
+        if not keep.any():
+            raise ValueError(
+                "No out of the money contracts with a valid implied volatility."
+            )
+
+        m = strike[keep] / spot
+        sigma = sigma[keep]
+        dte = dte[keep]
+
+        # Smile of every expiration on the moneyness grid (flat beyond the quoted strikes).
+        expirations = np.unique(dte)
+        smiles = np.empty((expirations.size, self.moneyness.size))
+        for i, d in enumerate(expirations):
+            rows = dte == d
+            order = np.argsort(m[rows])
+            smiles[i] = np.interp(self.moneyness, m[rows][order], sigma[rows][order])
+
+        # Total variance is linear in time between expirations.
+        if expirations.size == 1:
+            # A single expiration gives a surface that is flat in time.
+            self.dte = np.array([expirations[0], expirations[0] + 1])
+            self.iv_grid = np.vstack([smiles, smiles])
+        else:
+            self.dte = np.linspace(expirations[0], expirations[-1], self.dte_points)
+            variance = smiles**2 * expirations[:, None]
+            grid = np.empty((self.dte.size, self.moneyness.size))
+            for j in range(self.moneyness.size):
+                grid[:, j] = np.interp(self.dte, expirations, variance[:, j])
+            self.iv_grid = np.sqrt(grid / self.dte[:, None])
+        self.spot = spot
+        return self
+
+    def iv(self, K, T) -> np.ndarray:
+        """
+        Implied volatility at strike 'K' and time to expiration 'T' (in years).
+        Points outside the grid are clamped to its edges.
+
+        Parameters
+        ----------
+        K : array-like
+            Strike price.
+        T : array-like
+            Time to expiration (in years).
+
+        Returns
+        -------
+        np.ndarray
+            Interpolated implied volatility.
+        """
+        if not self.is_fitted():
+            raise ValueError("Volatility surface has not been fitted.")
+        m = np.asarray(K, dtype=np.float64) / self.spot
+        d = np.asarray(T, dtype=np.float64) * 365
+        i, wi = self._locate(d, self.dte)
+        j, wj = self._locate(m, self.moneyness)
+        grid = self.iv_grid
+        low = grid[i, j] * (1 - wj) + grid[i, j + 1] * wj
+        high = grid[i + 1, j] * (1 - wj) + grid[i + 1, j + 1] * wj
+        return low * (1 - wi) + high * wi
+
+    def _locate(self, values: np.ndarray, axis: np.ndarray):
+        """
+        Index of the lower grid node and the weight of the upper one, from the regular spacing of 'axis'.
+        """
+        step = axis[1] - axis[0]
+        position = np.clip((values - axis[0]) / step, 0, axis.size - 1)
+        index = np.minimum(position.astype(np.int64), axis.size - 2)
+        return index, position - index
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Fitted grid as a DataFrame, DTE on the index and moneyness as columns.
+        """
+        return pd.DataFrame(
+            self.iv_grid,
+            index=pd.Index(self.dte, name="dte"),
+            columns=pd.Index(self.moneyness, name="moneyness"),
+        )
@@ -4,6 +4,9 @@ import pandas as pd
 from pyfinviz.screener import Screener
 from pyfinviz.quote import Quote
 
+# Data providers
+from DataProviders.rate_limiter import get_limiter
+from DataProviders.provider import get_provider
 
 income_statement_mapping = {
     "Total Revenue": "Revenue",
@@ -22,6 +25,7 @@ class Finviz:
         self, export_path: str = "M:\\Finance\\stocks\\FINVIZ", log_errors: bool = True
     ):
         self.screener = Screener()
+        self.limiter = get_limiter("finviz")
         self.log_errors = log_errors
         self.export_dir = export_path
 
@@ -76,9 +80,13 @@ class Finviz:
         pd.DataFrame
             Dataframe containing information related to the financial statement.
         """
-        quote = Quote(ticker=ticker.upper())
+        statement = get_provider().fetch(
+            "finviz",
+            ("income_statement", ticker.upper()),
+            lambda: Quote(ticker=ticker.upper()).income_statement_df,
+        )
         # Transpose dataframe. Dates are now columns
-        df = quote.income_statement_df.T
+        df = statement.T
         # Set dates as columns
         df.columns = df.iloc[0]
         df = df[1:]
@@ -134,31 +142,64 @@ class Finviz:
         pd.DataFrame
             Dataframe containing information related to the financial statement.
         """
-        quote = Quote(ticker=ticker.upper())
+        statement = get_provider().fetch(
+            "finviz",
+            ("balance_sheet", ticker.upper()),
+            lambda: Quote(ticker=ticker.upper()).balance_sheet_df,
+        )
         # Transpose dataframe. Dates are now columns
-        df = quote.balance_sheet_df.T
+        df = statement.T
         # Set dates as columns
         df.columns = df.iloc[0]
         df = df[1:]
         df = df.iloc[:, ::-1]
         return df
 
-    def get_low_cap_movers(self):
+    def get_low_cap_movers(self, pages: int = 19):
         options = [
             # Screener.AnalystRecomOption.STRONG_BUY_1,
             Screener.MarketCapOption.SMALL_UNDER_USD2BLN,
             Screener.RelativeVolumeOption.OVER_1,
             Screener.CurrentVolumeOption.SHARES_OVER_1M,
         ]
-        screener = Screener(
-            filter_options=options,
-            view_option=Screener.ViewOption.VALUATION,
-            pages=[x for x in range(1, 20)],
+        df = self._fetch_screener_pages(
+            options, Screener.ViewOption.VALUATION, range(1, pages + 1)
         )
-        df = screener.data_frames
         df = self._convert_frames_many_to_one(df)
         return df
 
+    def _fetch_screener_pages(self, options: list, view_option, pages) -> dict:
+        """
+        Fetch screener pages one request at a time through the rate limiter.
+        Stops at the first empty or failed page and keeps the pages fetched so far.
+
+        Returns
+        -------
+        dict
+            Page number -> DataFrame.
+        """
+        frames = {}
+        for page in pages:
+            try:
+                data_frames = get_provider().fetch(
+                    "finviz",
+                    ("screener", options, view_option, page),
+                    lambda: Screener(
+                        filter_options=options,
+                        view_option=view_option,
+                        pages=[page],
+                    ).data_frames,
+                )
+            except Exception as e:
+                if self.log_errors:
+                    print(f"[Finviz] Page {page}: {e}")
+                break
+            page_frames = {k: v for k, v in data_frames.items() if not v.empty}
+            if page_frames == {}:
+                break
+            frames.update(page_frames)
+        return frames
+
     def _convert_frames_many_to_one(self, data: dict):
         df = pd.DataFrame()
         for k, v in data.items():
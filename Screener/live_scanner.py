@@ -0,0 +1,457 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+# Data
+import numpy as np
+import pandas as pd
+
+# Custom
+from Screener.top_mover import TopMovers
+
+
+class IncrementalIndicators:
+    def __init__(
+        self,
+        size: int,
+        rsi_window: int = 14,
+        emas: list = [9, 20, 200],
+        volume_window: int = 15,
+    ) -> None:
+        """
+        RSI, EMAs, relative volume and change of many tickers, advanced one bar at a time.
+
+        Every bar updates the state of all tickers at once in O(tickers). The values are the same as
+        'TechnicalAnalysis.rsi_frame()', 'ema_frame()' and a rolling average volume over every bar stepped so far.
+
+        Parameters
+        ----------
+        size : int
+            Number of tickers.
+        rsi_window : int, optional
+            Window of the RSI, by default 14
+        emas : list, optional
+            Windows of the EMAs, by default [9, 20, 200]
+        volume_window : int, optional
+            Number of bars in the average volume, by default 15
+        """
+        self.rsi_window = rsi_window
+        self.emas = list(emas)
+        self.volume_window = volume_window
+        self.rows = 0
+        self.day = None
+        self.bar_time = None
+        self.close = np.full(size, np.nan)
+        self.last_close = np.full(size, np.nan)
+        self.day_open = np.full(size, np.nan)
+        self.volume = np.full(size, np.nan)
+        # Wilder smoothing (adjusted EWM) numerators of gains and losses, and number of changes seen.
+        self.gains = np.zeros(size)
+        self.losses = np.zeros(size)
+        self.changes = np.zeros(size, dtype=np.int64)
+        # EMA values, weights of the previous value and the sums seeding them.
+        self.ema = {w: np.full(size, np.nan) for w in self.emas}
+        self.ema_weight = {w: np.ones(size) for w in self.emas}
+        self.ema_seed = {w: np.zeros(size) for w in self.emas}
+        self.volumes = np.full((volume_window, size), np.nan)
+
+    def copy(self):
+        other = IncrementalIndicators.__new__(IncrementalIndicators)
+        for name, value in self.__dict__.items():
+            if isinstance(value, np.ndarray):
+                value = value.copy()
+            elif isinstance(value, dict):
+                value = {k: v.copy() for k, v in value.items()}
+            setattr(other, name, value)
+        return other
+
+    def step(
+        self,
+        bar_time: pd.Timestamp,
+        open_: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+    ):
+        """
+        Advance every ticker by one bar. Missing values (NaN) are gaps of that ticker.
+        """
+        observed = ~np.isnan(close)
+
+        # Change from the open of the day.
+        day = bar_time.date()
+        if day != self.day:
+            self.day = day
+            self.day_open[:] = np.nan
+        opening = np.isnan(self.day_open)
+        self.day_open[opening] = open_[opening]
+
+        # RSI: changes from the previous available close, smoothed over observed changes only.
+        diff = close - self.last_close
+        changed = ~np.isnan(diff)
+        factor = 1 - 1 / self.rsi_window
+        self.gains[changed] = factor * self.gains[changed] + np.maximum(
+            diff[changed], 0
+        )
+        self.losses[changed] = factor * self.losses[changed] + np.maximum(
+            -diff[changed], 0
+        )
+        self.changes += changed
+
+        # EMA seeded with the SMA of the first 'window' bars, gaps keep decaying the previous value.
+        for w in self.emas:
+            alpha = 2 / (w + 1)
+            if self.rows < w - 1:
+                self.ema_seed[w] += np.nan_to_num(close)
+            elif self.rows == w - 1:
+                self.ema_seed[w] += np.nan_to_num(close)
+                self.ema[w] = self.ema_seed[w] / w
+                self.ema_weight[w][:] = 1.0
+            else:
+                weight = self.ema_weight[w] * (1 - alpha)
+                value = self.ema[w]
+                value[observed] = (
+                    weight[observed] * value[observed] + alpha * close[observed]
+                ) / (weight[observed] + alpha)
+                weight[observed] = 1.0
+                self.ema_weight[w] = weight
+
+        self.volumes = np.roll(self.volumes, -1, axis=0)
+        self.volumes[-1] = volume
+        self.last_close[observed] = close[observed]
+        self.close = close
+        self.volume = volume
+        self.bar_time = bar_time
+        self.rows += 1
+
+    def get_rsi(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rsi = 100 * self.gains / (self.gains + self.losses)
+        return np.where(self.changes >= self.rsi_window, rsi, np.nan)
+
+    def get_average_volume(self) -> np.ndarray:
+        if self.rows < self.volume_window:
+            return np.full(self.volumes.shape[1], np.nan)
+        return self.volumes.mean(axis=0)
+
+    def to_frame(self, tickers: list) -> pd.DataFrame:
+        """
+        Latest values, one row per ticker.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frame = {
+                "close": self.last_close,
+                "change": (self.last_close / self.day_open - 1) * 100,
+                "volume": self.volume,
+                "relative_volume": self.volume / self.get_average_volume(),
+                "rsi": self.get_rsi(),
+            }
+            for w in self.emas:
+                frame[f"ema_{w}"] = self.ema[w]
+                frame[f"spread_{w}"] = (
+                    (self.ema[w] - self.last_close) / np.abs(self.last_close) * 100
+                )
+        return pd.DataFrame(frame, index=pd.Index(tickers, name="ticker"))
+
+
+class ScanSnapshot:
+    def __init__(
+        self, ranked: pd.DataFrame, bar_time: pd.Timestamp, stats: dict
+    ) -> None:
+        """
+        Ranked tickers of one scanner cycle.
+
+        Parameters
+        ----------
+        ranked : pd.DataFrame
+            One row per ticker, best first, with a 'score' column.
+        bar_time : pd.Timestamp
+            Time of the newest (provisional) bar.
+        stats : dict
+            Timings of the cycle, see 'TopMoversScanner.stats'.
+        """
+        self.ranked = ranked
+        self.bar_time = bar_time
+        self.stats = stats
+        self.time = pd.Timestamp.now()
+
+    def __repr__(self) -> str:
+        return f"ScanSnapshot(bar_time={self.bar_time}, tickers={len(self.ranked)})"
+
+
+class TopMoversScanner:
+    def __init__(
+        self,
+        tickers: list,
+        interval: str = "5m",
+        period: str = "1d",
+        prepost: bool = True,
+        refresh_seconds: float = 60.0,
+        latency_budget: float = 10.0,
+        rank_by: list = ["change", "relative_volume", "rsi"],
+        top: int = None,
+        rsi_window: int = 14,
+        emas: list = [9, 20, 200],
+        volume_window: int = 15,
+        top_movers: TopMovers = None,
+    ) -> None:
+        """
+        Long-running top movers scan. Every cycle refreshes the candles (only the bars after the last stored one
+        are downloaded), advances the indicators by the new bars only, ranks the tickers and publishes a ScanSnapshot.
+
+        Completed bars are committed to the indicator state. The newest bar is still forming, so it is evaluated
+        on a copy of the state and replaced on the next cycle.
+
+        Parameters
+        ----------
+        tickers : list
+            Tickers to scan.
+        interval : str, optional
+            Candle interval, by default "5m"
+        period : str, optional
+            History loaded on the first cycle, by default "1d"
+        prepost : bool, optional
+            Include pre/post market candles, by default True
+        refresh_seconds : float, optional
+            Seconds between cycles in 'run()', by default 60.0
+        latency_budget : float, optional
+            Seconds a cycle waits for its download. A late download keeps running and is used by a later cycle,
+            the current cycle publishes from the previous bars, by default 10.0
+        rank_by : list, optional
+            Columns ranked descending, the score is the average of their percentile ranks,
+            by default ["change", "relative_volume", "rsi"]
+        top : int, optional
+            Number of tickers published, by default every ticker
+        rsi_window : int, optional
+            Window of the RSI, by default 14
+        emas : list, optional
+            Windows of the EMAs, by default [9, 20, 200]
+        volume_window : int, optional
+            Number of bars in the average volume, by default 15
+        top_movers : TopMovers, optional
+            Provides the candle store and crypto settings, by default a new TopMovers
+        """
+        self.top_movers = TopMovers() if top_movers is None else top_movers
+        if self.top_movers.is_crypto:
+            tickers = [f"{t}-{self.top_movers.crypto_quotes}" for t in tickers]
+            prepost = False
+        self.tickers = [t.upper() for t in tickers]
+        self.interval = interval
+        self.period = period
+        self.prepost = prepost
+        self.refresh_seconds = refresh_seconds
+        self.latency_budget = latency_budget
+        self.rank_by = rank_by
+        self.top = top
+        self.indicators = IncrementalIndicators(
+            len(self.tickers), rsi_window, emas, volume_window
+        )
+        self.committed_until = None
+        self.provisional = None
+        self.snapshot = None
+        self.subscribers = []
+        # Counters since the start and timings of the last cycle.
+        self.stats = {
+            "cycles": 0,
+            "late_fetches": 0,
+            "over_budget": 0,
+            "new_bars": 0,
+            "fetch_seconds": 0.0,
+            "compute_seconds": 0.0,
+            "publish_seconds": 0.0,
+        }
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    """
+    ==================================================================================================================================
+    Subscribers
+    ==================================================================================================================================
+    """
+
+    def subscribe(self, target):
+        """
+        Publish every snapshot to 'target': a callable called with the ScanSnapshot, a queue (anything with 'put()')
+        receiving the ScanSnapshot, or a file path the ranked frame is written to ('.json', otherwise CSV).
+        """
+        self.subscribers.append(target)
+
+    def unsubscribe(self, target):
+        self.subscribers.remove(target)
+
+    def _publish(self, snapshot: ScanSnapshot):
+        for target in list(self.subscribers):
+            try:
+                if isinstance(target, str):
+                    self._write_snapshot(target, snapshot)
+                elif hasattr(target, "put"):
+                    target.put(snapshot)
+                else:
+                    target(snapshot)
+            except Exception as e:
+                print(f"[Top Movers Scanner] Subscriber {target}: {e}")
+
+    def _write_snapshot(self, path: str, snapshot: ScanSnapshot):
+        directory = os.path.dirname(path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        if path.endswith(".json"):
+            snapshot.ranked.to_json(temporary, orient="index")
+        else:
+            snapshot.ranked.to_csv(temporary)
+        os.replace(temporary, path)
+
+    """
+    ==================================================================================================================================
+    Scanning
+    ==================================================================================================================================
+    """
+
+    def refresh(self) -> ScanSnapshot:
+        """
+        Run one cycle: fetch, update, rank and publish.
+
+        Returns
+        -------
+        ScanSnapshot
+            None until the first download completed.
+        """
+        start = time.perf_counter()
+        candles = self._fetch_within_budget()
+        fetched = time.perf_counter()
+        new_bars = 0
+        if candles is not None and not candles.empty:
+            new_bars = self._update(candles)
+        if self.indicators.rows > 0 or self.provisional is not None:
+            ranked, bar_time = self._rank()
+        computed = time.perf_counter()
+
+        self.stats["cycles"] += 1
+        self.stats["late_fetches"] += candles is None
+        self.stats["new_bars"] = new_bars
+        self.stats["fetch_seconds"] = fetched - start
+        self.stats["compute_seconds"] = computed - fetched
+        if self.indicators.rows == 0 and self.provisional is None:
+            return None
+        self.snapshot = ScanSnapshot(ranked, bar_time, dict(self.stats))
+        self._publish(self.snapshot)
+        self.stats["publish_seconds"] = time.perf_counter() - computed
+        if time.perf_counter() - start > self.latency_budget:
+            self.stats["over_budget"] += 1
+        return self.snapshot
+
+    def run(self, iterations: int = None):
+        """
+        Refresh every 'self.refresh_seconds' seconds until 'stop()' is called (or 'iterations' cycles were run).
+        """
+        self._stop.clear()
+        count = 0
+        while not self._stop.is_set() and (iterations is None or count < iterations):
+            start = time.perf_counter()
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[Top Movers Scanner] {e}")
+            count += 1
+            self._stop.wait(
+                max(self.refresh_seconds - (time.perf_counter() - start), 0)
+            )
+
+    def start(self):
+        """
+        Run the scanner in a background thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def get_snapshot(self) -> ScanSnapshot:
+        return self.snapshot
+
+    """
+    ==================================================================================================================================
+    State
+    ==================================================================================================================================
+    """
+
+    def _fetch(self) -> pd.DataFrame:
+        # 'max_age=0' always refreshes the tail, so the forming bar is updated every cycle.
+        return self.top_movers.candle_store.download(
+            self.tickers,
+            period=self.period,
+            interval=self.interval,
+            prepost=self.prepost,
+            max_age=0,
+        )
+
+    def _fetch_within_budget(self):
+        """
+        Candles of the running (or a new) download, None when it isn't done within the latency budget.
+        """
+        if self._pending is None:
+            self._pending = self._executor.submit(self._fetch)
+        try:
+            candles = self._pending.result(timeout=self.latency_budget)
+        except TimeoutError:
+            return None
+        except Exception as e:
+            self._pending = None
+            print(f"[Top Movers Scanner] {e}")
+            return None
+        self._pending = None
+        return candles
+
+    def _update(self, candles: pd.DataFrame) -> int:
+        """
+        Commit the completed bars after 'self.committed_until' and keep the newest bar as provisional.
+        Returns the number of committed bars.
+        """
+        columns = pd.MultiIndex.from_product(
+            [["Open", "Close", "Volume"], self.tickers]
+        )
+        candles = candles.reindex(columns=columns).sort_index()
+        if self.committed_until is not None:
+            candles = candles[candles.index > self.committed_until]
+        if candles.empty:
+            return 0
+        values = {
+            f: candles[f].to_numpy(dtype=np.float64)
+            for f in ["Open", "Close", "Volume"]
+        }
+        index = candles.index
+        for i in range(len(index) - 1):
+            self.indicators.step(
+                index[i], values["Open"][i], values["Close"][i], values["Volume"][i]
+            )
+        if len(index) > 1:
+            self.committed_until = index[-2]
+        self.provisional = (
+            index[-1],
+            values["Open"][-1],
+            values["Close"][-1],
+            values["Volume"][-1],
+        )
+        return len(index) - 1
+
+    def _rank(self) -> tuple:
+        indicators = self.indicators
+        if self.provisional is not None:
+            indicators = indicators.copy()
+            indicators.step(*self.provisional)
+        frame = indicators.to_frame(self.tickers)
+        ranks = frame[self.rank_by].rank(pct=True, ascending=True)
+        frame["score"] = ranks.mean(axis=1)
+        frame = frame.sort_values("score", ascending=False)
+        if self.top is not None:
+            frame = frame.head(self.top)
+        return frame, indicators.bar_time
@@ -1,6 +1,7 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
-import yfinance as yf
 
 pd.set_option("display.float_format", "{:,.2f}".format)
 
@@ -8,6 +9,9 @@ pd.set_option("display.float_format", "{:,.2f}".format)
 # Custom
 from TechnicalAnalysis.ta import TechnicalAnalysis
 from Screener.yahoo import YahooScreener
+from LocalStorage.candle_store import CandleStore
+from DataProviders.fundamentals import get_fundamentals, info_source
+from DataProviders.rate_limiter import get_limiter
 
 
 class TopMovers:
@@ -18,16 +22,22 @@ class TopMovers:
         convert_tz: bool = True,
         local_tz: str = "PST",
         mcap_terms: str = "m",
+        info_rate: float = 20.0,
     ) -> None:
         self.is_crypto = is_crypto
         self.crypto_quotes = crypto_quotes
         self.convert_tz = convert_tz
         self.local_tz = local_tz.upper()
         self.mcap_terms = mcap_terms
+        # Requests per second of the Yahoo info limiter used by 'set_metrics()', other Yahoo requests keep their limits.
+        self.info_rate = info_rate
         self.tickers = []
         self.data = pd.DataFrame()
         self.metrics = pd.DataFrame()
+        self.show_percent_values = False
         self.yahoo = YahooScreener()
+        self.candle_store = CandleStore()
+        self.fundamentals = get_fundamentals()
 
     def set_data(
         self,
@@ -37,6 +47,7 @@ class TopMovers:
         candle_period: str = "1d",
         candle_interval: str = "5m",
         candle_prepost: bool = True,
+        max_workers: int = 8,
     ):
         if self.is_crypto:
             tickers = [f"{t}-{self.crypto_quotes}" for t in tickers]
@@ -53,16 +64,15 @@ class TopMovers:
             data = self._apply_technical_indicators(data, multi_fetched=multi_fetch)
 
         else:
-
-            data = {}
-            for t in self.tickers:
-                print(f"T: {t}")
-                candle = self._fetch_candle(t)
-                candle = self._apply_volume(candle)
-                candle = self._apply_technical_indicators(candle)
-                data[t] = candle
-                if merge_data:
-                    data = self._merge_dataframes(data)
+            data = self._fetch_each(
+                tickers,
+                interval=candle_interval,
+                period=candle_period,
+                prepost=candle_prepost,
+                max_workers=max_workers,
+            )
+            if merge_data:
+                data = self._merge_dataframes(data)
         self.data = data
 
     def get_data(self):
@@ -74,52 +84,73 @@ class TopMovers:
         show_percent_values: bool = False,
         include_base_columns: bool = False,
     ):
-        percentage_cols = ["short_ratio", "relative_volume"]
+        """
+        Set short ratio, relative volume and market cap of 'tickers' in 'self.metrics'.
+
+        Info dicts are fetched concurrently, every metric is computed on whole columns and the
+        frame is built once. Values stay numeric, see 'get_metrics()' for the formatted view.
 
+        Parameters
+        ----------
+        tickers : list, optional
+            Tickers to compute, by default 'self.tickers'
+        show_percent_values : bool, optional
+            Express relative volume in percent and format the percentage columns, by default False
+        include_base_columns : bool, optional
+            Include shares outstanding and shares short, by default False
+        """
         if self.is_crypto:
-            pass
-        else:
-            if tickers == []:
-                tickers = self.tickers
-            for t in tickers:
-                t_obj = yf.Ticker(t)
-                info = t_obj.info
-                # Short Ratio
-                shares = info.get("sharesOutstanding")
-                shares_short = info.get("sharesShort")
-                short_ratio = shares_short / shares
-                short_ratio *= 100
-                shares = self._format_magnitude(shares)
-                shares_short = self._format_magnitude(shares_short)
-                if include_base_columns:
-                    self.metrics.loc[t, f"shares({self.mcap_terms})"] = shares
-                    self.metrics.loc[t, f"shares_short({self.mcap_terms})"] = (
-                        shares_short
-                    )
-                self.metrics.loc[t, "short_ratio"] = short_ratio
-                # Relative Volume
-                vol = info.get("volume")
-                avg_vol = info.get("averageVolume")
-                rel_vol = vol / avg_vol
-                if show_percent_values:
-                    rel_vol *= 100
-                    self.metrics.loc[t, "relative_volume"] = rel_vol
-                else:
-                    self.metrics.loc[t, "relative_volume"] = rel_vol
-                # Marketcap
-                mcap = info.get("marketCap")
-                mcap = self._format_magnitude(mcap)
-                self.metrics.loc[t, f"marketcap({self.mcap_terms})"] = mcap
-
-            if show_percent_values:
-                perc_format = "{:,.2f}%"
-                for c in percentage_cols:
-                    self.metrics[c] = self.metrics[c].apply(
-                        lambda x: perc_format.format(x)
-                    )
-
-    def get_metrics(self):
-        return self.metrics
+            return
+        if tickers == []:
+            tickers = self.tickers
+        fields = [
+            "sharesOutstanding",
+            "sharesShort",
+            "volume",
+            "averageVolume",
+            "marketCap",
+        ]
+        get_limiter(info_source).set_limits(
+            rate=self.info_rate, burst=max(int(self.info_rate), 1)
+        )
+        info = self.fundamentals.get_frame(tickers, fields).astype(np.float64)
+        shares = info["sharesOutstanding"]
+        shares_short = info["sharesShort"]
+
+        metrics = {}
+        if include_base_columns:
+            metrics[f"shares({self.mcap_terms})"] = self._format_magnitude(shares)
+            metrics[f"shares_short({self.mcap_terms})"] = self._format_magnitude(
+                shares_short
+            )
+        metrics["short_ratio"] = shares_short / shares * 100
+        relative_volume = info["volume"] / info["averageVolume"]
+        if show_percent_values:
+            relative_volume *= 100
+        metrics["relative_volume"] = relative_volume
+        metrics[f"marketcap({self.mcap_terms})"] = self._format_magnitude(
+            info["marketCap"]
+        )
+        self.metrics = pd.DataFrame(metrics)
+        self.metrics.index.name = None
+        self.show_percent_values = show_percent_values
+
+    def get_metrics(self, formatted: bool = True) -> pd.DataFrame:
+        """
+        Metrics set by 'set_metrics()'. When it was called with 'show_percent_values' and 'formatted' is True,
+        the percentage columns are returned as strings, otherwise every column is numeric.
+        """
+        if not formatted or not self.show_percent_values:
+            return self.metrics
+        return self._format_metrics(self.metrics)
+
+    def _format_metrics(self, metrics: pd.DataFrame) -> pd.DataFrame:
+        percentage_cols = ["short_ratio", "relative_volume"]
+        perc_format = "{:,.2f}%"
+        metrics = metrics.copy()
+        for c in percentage_cols:
+            metrics[c] = metrics[c].map(perc_format.format)
+        return metrics
 
     def _multi_fetch_candle(
         self,
@@ -148,7 +179,9 @@ class TopMovers:
             Multi-columned dataframe containing OHLCV data.
         """
 
-        candle = yf.download(tickers, period=period, interval=interval, prepost=prepost)
+        candle = self.candle_store.download(
+            tickers, period=period, interval=interval, prepost=prepost
+        )
         if self.convert_tz:
             tz = self._get_tz()
             candle.index = candle.index.tz_convert(tz)
@@ -182,9 +215,11 @@ class TopMovers:
         """
 
         if self.is_crypto:
-            candle = yf.download(ticker, period=period, interval=interval)
+            candle = self.candle_store.download(
+                ticker, period=period, interval=interval
+            )
         else:
-            candle = yf.download(
+            candle = self.candle_store.download(
                 ticker,
                 period=period,
                 interval=interval,
@@ -196,6 +231,51 @@ class TopMovers:
             candle.index = candle.index.tz_convert(tz)
         return candle
 
+    def _fetch_each(
+        self,
+        tickers: list,
+        interval: str = "5m",
+        period: str = "1d",
+        prepost: bool = True,
+        max_workers: int = 8,
+    ) -> dict:
+        """
+        Apply volume and indicators to the candles of every ticker separately, in a thread pool.
+        Missing candles are downloaded first in one batched request, workers read them from the candle store.
+
+        Returns
+        -------
+        dict
+            Ticker -> candles with indicators, in the order of 'tickers'. Tickers that failed are left out.
+        """
+        if tickers == []:
+            return {}
+        try:
+            self.candle_store.update(
+                tickers,
+                period=period,
+                interval=interval,
+                prepost=prepost and not self.is_crypto,
+            )
+        except Exception as e:
+            # Workers fall back to downloading their own ticker.
+            print(f"[Top Movers] {e}")
+
+        def process(ticker: str):
+            try:
+                candle = self._fetch_candle(
+                    ticker, interval=interval, period=period, prepost=prepost
+                )
+                candle = self._apply_volume(candle)
+                return self._apply_technical_indicators(candle)
+            except Exception as e:
+                print(f"[Top Movers] {ticker}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers))) as executor:
+            candles = list(executor.map(process, tickers))
+        return {t: c for t, c in zip(tickers, candles) if c is not None}
+
     def _get_tz(self):
         if self.local_tz == "PST":
             return "America/Los_Angeles"
@@ -217,24 +297,32 @@ class TopMovers:
         return: pd.DataFrame
             Merged Dataframes.
         """
-        print(f"DATA: {data}  TYPE: {type(data)}")
+        if data == {}:
+            return pd.DataFrame()
         tickers = list(data.keys())
         values = list(data.values())
 
         df = pd.concat(values, axis=1, keys=tickers)
         return df
 
+    def _concat_fields(self, df: pd.DataFrame, fields: dict) -> pd.DataFrame:
+        """
+        Append (time x ticker) frames to a (Price, Ticker) frame as new 'Price' fields, in a single concat.
+        """
+        new = pd.concat(fields, axis=1, names=[df.columns.names[0]])
+        return pd.concat([df, new], axis=1)
+
     def _format_magnitude(self, value):
         thousands = ["t", "th", "thousand", "thousands"]
         millions = ["m", "mi", "mil", "million", "millions"]
         billions = ["b", "bi", "bil", "billion", "billions"]
         term = self.mcap_terms.lower()
         if term in thousands:
-            value /= 1_000
+            value = value / 1_000
         elif term in millions:
-            value /= 1_000_000
+            value = value / 1_000_000
         elif term in billions:
-            value /= 1_000_000_000
+            value = value / 1_000_000_000
         return value
 
     def _get_term_base(self):
@@ -283,14 +371,12 @@ class TopMovers:
             _description_
         """
         if multi_fetched:
-            for t in self.tickers:
-                df[("Average_Volume", t)] = (
-                    df[("Volume", t)].rolling(window=window).mean()
-                )
-            for t in self.tickers:
-                df[("Relative_Volume", t)] = (
-                    df[("Volume", t)] / df[("Average_Volume", t)]
-                )
+            average_volume = df["Volume"].rolling(window=window).mean()
+            volume = {
+                "Average_Volume": average_volume,
+                "Relative_Volume": df["Volume"] / average_volume,
+            }
+            df = self._concat_fields(df, volume)
         else:
             df["Average_Volume"] = df["Volume"].rolling(window=window).mean()
             df["Relative_Volume"] = df["Volume"] / df["Average_Volume"]
@@ -325,15 +411,12 @@ class TopMovers:
 
         ta = TechnicalAnalysis()
         if multi_fetched:
-
-            for t in self.tickers:
-                # RSI
-                df[("RSI", t)] = ta.rsi(df[("Close", t)].dropna(), window=rsi_window)
+            # One pass per indicator over the (time x ticker) close matrix.
+            close = df["Close"]
+            indicators = {"RSI": ta.rsi_frame(close, window=rsi_window)}
             for e in emas:
-                # EMA
-                for e in emas:
-                    for t in self.tickers:
-                        df[(f"EMA_{e}", t)] = ta.ema(df[("Close", t)], window=e)
+                indicators[f"EMA_{e}"] = ta.ema_frame(close, window=e)
+            df = self._concat_fields(df, indicators)
         else:
             # RSI
             df["RSI"] = ta.rsi(df["Close"], window=rsi_window)
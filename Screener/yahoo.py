@@ -13,6 +13,9 @@ import pytz
 
 from MachineLearning.NLP.sentiment_analysis import SentimentAnalysis
 
+# Data providers
+from DataProviders.provider import get_provider
+
 
 class YahooAggregator:
     def __init__(self, tickers: str):
@@ -67,11 +70,19 @@ class YahooScreener:
         if ticker != "":
             self.ticker = ticker.upper()
             self.obj = yf.Ticker(ticker=self.ticker)
-            self.income_statement = self.obj.income_stmt.iloc[
+            self.income_statement = self._fetch("income_stmt").iloc[
                 :, ::-1
             ]  # Reverse columns. Now new dates are on the right.
-            self.balance_sheet = self.obj.balance_sheet.iloc[:, ::-1]
-            self.cash_flow = self.obj.cash_flow.iloc[:, ::-1]
+            self.balance_sheet = self._fetch("balance_sheet").iloc[:, ::-1]
+            self.cash_flow = self._fetch("cash_flow").iloc[:, ::-1]
+
+    def _fetch(self, attribute: str):
+        """
+        Read an attribute of 'self.obj' (a request to Yahoo) through the data provider.
+        """
+        return get_provider().fetch(
+            "yahoo", (attribute, self.ticker), getattr, self.obj, attribute
+        )
 
     """
     ==================================================================================================================================
@@ -173,7 +184,7 @@ class YahooScreener:
         return pst_time
 
     def get_news(self):
-        news = self.obj.news
+        news = self._fetch("news")
         data = {
             "date": [],
             "id": [],
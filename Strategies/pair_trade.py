@@ -1,22 +1,25 @@
 import numpy as np
 import pandas as pd
-import yfinance as yf
+
+# Storage
+from LocalStorage.candle_store import CandleStore
 
 
 class PairTrade:
     def __init__(self, base_ticker: str, compare_ticker: str) -> None:
         self.base_ticker = base_ticker.upper()
         self.compare_ticker = compare_ticker.upper()
+        self.candle_store = CandleStore()
 
     def set_data(self, interval: str = "1m", period: str = "max"):
         # Base data
-        base_candle = yf.download(
+        base_candle = self.candle_store.download(
             self.base_ticker, interval=interval, period=period, multi_level_index=False
         )
         base_dates = base_candle.index.to_list()
         recent_base_date = base_dates[-1]
         # Compare data
-        compare_candle = yf.download(
+        compare_candle = self.candle_store.download(
             self.compare_ticker,
             interval=interval,
             period=period,
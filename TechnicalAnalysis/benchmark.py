@@ -0,0 +1,70 @@
+import time
+
+# Data
+import numpy as np
+import pandas as pd
+
+# Custom
+from TechnicalAnalysis.ta import TechnicalAnalysis
+
+
+def get_sample(bars: int = 1_000_000, seed: int = 0) -> pd.DataFrame:
+    """
+    Random walk of 1 minute candles, from 4:00 in New York, with high, low, close and volume columns.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(
+        "2024-01-02 04:00", periods=bars, freq="1min", tz="America/New_York"
+    )
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, bars)))
+    spread = np.abs(rng.normal(0, 0.001, bars)) * close
+    return pd.DataFrame(
+        {
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.integers(100, 10_000, bars).astype(float),
+        },
+        index=index,
+    )
+
+
+def benchmark(bars: int = 1_000_000, repeat: int = 3) -> pd.DataFrame:
+    """
+    Best time of 'repeat' runs of every indicator with both backends, and the largest difference between them.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per indicator: "pandas_ta" and "numpy" seconds, "speedup" and "max_diff".
+    """
+    df = get_sample(bars)
+    backends = {b: TechnicalAnalysis(backend=b) for b in ["pandas_ta", "numpy"]}
+    indicators = {
+        "rsi_14": lambda ta: ta.rsi(df["close"], 14),
+        "ema_20": lambda ta: ta.ema(df["close"], 20),
+        "ema_200": lambda ta: ta.ema(df["close"], 200),
+        "sma_20": lambda ta: ta.sma(df["close"], 20),
+        "vwap": lambda ta: ta.vwap(df["high"], df["low"], df["close"], df["volume"]),
+    }
+    rows = {}
+    for name, indicator in indicators.items():
+        row = {}
+        results = {}
+        for backend, ta in backends.items():
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                results[backend] = indicator(ta)
+                timings.append(time.perf_counter() - start)
+            row[backend] = min(timings)
+        row["speedup"] = row["pandas_ta"] / row["numpy"]
+        row["max_diff"] = (results["pandas_ta"] - results["numpy"]).abs().max()
+        rows[name] = row
+    return pd.DataFrame(rows).T
+
+
+if __name__ == "__main__":
+    bars = 1_000_000
+    print(f"[Benchmark] {bars:,} bars")
+    print(benchmark(bars).to_string(float_format="{:.6g}".format))
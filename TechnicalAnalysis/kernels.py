@@ -0,0 +1,164 @@
+"""
+NumPy indicator kernels with the same output as pandas_ta.
+
+Every kernel takes 1D arrays or 2D (time x series) arrays, time being the first axis, and returns an array of the
+same shape. Missing values (NaN) are handled the way pandas_ta (pandas 'ewm'/'rolling') handles them.
+"""
+
+import numpy as np
+from scipy.signal import lfilter
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling mean of the last 'window' values, NaN until 'window' values are available or when one of them is missing.
+    """
+    x, squeeze = _as_2d(values)
+    missing = np.isnan(x)
+    sums = _rolling_sum(np.where(missing, 0.0, x), window)
+    counts = _rolling_sum(missing.astype(np.float64), window)
+    sums[counts > 0] = np.nan
+    return _restore(sums / window, squeeze)
+
+
+def ema(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    EMA seeded with the SMA of the first 'window' values ('pandas_ta.ema()', adjust=False).
+    Missing values keep the previous EMA, which loses weight for every missing step.
+    """
+    x, squeeze = _as_2d(values)
+    out = np.full(x.shape, np.nan)
+    if len(x) < window:
+        return _restore(out, squeeze)
+    alpha = 2 / (window + 1)
+    decay = 1 - alpha
+    seed = np.nansum(x[:window], axis=0) / window
+    out[window - 1] = seed
+    rest = x[window:]
+    gaps = np.isnan(rest).any(axis=0)
+    complete = ~gaps
+    if complete.any() and len(rest) > 0:
+        out[window:, complete], _ = lfilter(
+            [alpha],
+            [1, -decay],
+            rest[:, complete],
+            axis=0,
+            zi=(decay * seed[complete])[np.newaxis, :],
+        )
+    for column in np.flatnonzero(gaps):
+        out[window:, column] = _ema_with_gaps(rest[:, column], seed[column], alpha)
+    return _restore(out, squeeze)
+
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    RSI with Wilder smoothing ('pandas_ta.rsi()': adjusted EWM with alpha 1/window over the gains and losses).
+    """
+    x, squeeze = _as_2d(close)
+    diff = np.full(x.shape, np.nan)
+    diff[1:] = x[1:] - x[:-1]
+    observed = ~np.isnan(diff)
+    decay = 1 - 1 / window
+    # The average gain and loss share the EWM denominator, so the RSI only needs both numerators.
+    # Missing changes add nothing but still decay the previous ones.
+    gains = lfilter(
+        [1], [1, -decay], np.where(observed, np.maximum(diff, 0), 0), axis=0
+    )
+    losses = lfilter(
+        [1], [1, -decay], np.where(observed, np.maximum(-diff, 0), 0), axis=0
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = 100 * gains / (gains + losses)
+    out[np.cumsum(observed, axis=0) < window] = np.nan
+    return _restore(out, squeeze)
+
+
+def vwap(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    groups: np.ndarray = None,
+) -> np.ndarray:
+    """
+    Cumulative VWAP of the typical price (high + low + close) / 3, restarted at every change of 'groups'.
+
+    Parameters
+    ----------
+    groups : np.ndarray, optional
+        One label per row (e.g. the day of each bar), consecutive rows with the same label are accumulated together,
+        by default a single group.
+    """
+    h, squeeze = _as_2d(high)
+    l, _ = _as_2d(low)
+    c, _ = _as_2d(close)
+    v, _ = _as_2d(volume)
+    weighted = (h + l + c) / 3 * v
+    missing_weighted = np.isnan(weighted)
+    missing_volume = np.isnan(v)
+    weighted_sums = _group_cumsum(np.where(missing_weighted, 0.0, weighted), groups)
+    volume_sums = _group_cumsum(np.where(missing_volume, 0.0, v), groups)
+    weighted_sums[missing_weighted] = np.nan
+    volume_sums[missing_volume] = np.nan
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = weighted_sums / volume_sums
+    return _restore(out, squeeze)
+
+
+def _as_2d(values) -> tuple:
+    x = np.asarray(values, dtype=np.float64)
+    if x.ndim == 1:
+        return x[:, np.newaxis], True
+    return x, False
+
+
+def _restore(values: np.ndarray, squeeze: bool) -> np.ndarray:
+    return values[:, 0] if squeeze else values
+
+
+def _rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    sums = np.cumsum(x, axis=0)
+    sums[window:] = sums[window:] - sums[:-window]
+    sums[: window - 1] = np.nan
+    return sums
+
+
+def _group_cumsum(x: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    sums = np.cumsum(x, axis=0)
+    if groups is None or len(x) == 0:
+        return sums
+    groups = np.asarray(groups)
+    starts = np.flatnonzero(groups[1:] != groups[:-1]) + 1
+    # Running total before the first row of each group, repeated over the rows of that group.
+    offsets = np.zeros((len(starts) + 1, x.shape[1]))
+    offsets[1:] = sums[starts - 1]
+    lengths = np.diff(np.concatenate([[0], starts, [len(x)]]))
+    return sums - np.repeat(offsets, lengths, axis=0)
+
+
+def _ema_with_gaps(x: np.ndarray, previous: float, alpha: float) -> np.ndarray:
+    """
+    EMA of one series with missing values, continuing from 'previous'. Every run of consecutive values is filtered
+    at once, the first value after a gap weighs the previous EMA by (1 - alpha) ** (gap + 1) like pandas.
+    """
+    decay = 1 - alpha
+    out = np.empty(len(x))
+    observed = np.flatnonzero(~np.isnan(x))
+    runs = np.split(observed, np.flatnonzero(np.diff(observed) > 1) + 1)
+    last = -1
+    for run in runs:
+        if len(run) == 0:
+            continue
+        start, stop = run[0], run[-1] + 1
+        out[last + 1 : start] = previous
+        weight = decay ** (start - last)
+        first = (weight * previous + alpha * x[start]) / (weight + alpha)
+        out[start] = first
+        if stop - start > 1:
+            out[start + 1 : stop], _ = lfilter(
+                [alpha], [1, -decay], x[start + 1 : stop], zi=[decay * first]
+            )
+        previous = out[stop - 1]
+        last = stop - 1
+    out[last + 1 :] = previous
+    return out
@@ -1,20 +1,85 @@
 import warnings
+import numpy as np
 import pandas as pd
-import pandas_ta as pta
+
+# Custom
+from TechnicalAnalysis import kernels
+
+BACKENDS = ["pandas_ta", "numpy"]
 
 
 class TechnicalAnalysis:
-    def __init__(self):
-        pass
+    def __init__(self, backend: str = "pandas_ta"):
+        """
+        Parameters
+        ----------
+        backend : str, optional
+            "pandas_ta", or "numpy" for the kernels of 'TechnicalAnalysis.kernels' (same values, without importing
+            pandas_ta), by default "pandas_ta"
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        self.backend = backend
+        # pandas_ta is only imported by the backend using it.
+        self.pta = None
+        if backend == "pandas_ta":
+            import pandas_ta as pta
+
+            self.pta = pta
 
     def rsi(self, close_values: pd.Series, window: int = 14) -> pd.Series:
-        rsi = pta.rsi(close=close_values, length=window)
+        if self.backend == "numpy":
+            return self._to_series(
+                kernels.rsi(close_values, window), close_values, f"RSI_{window}"
+            )
+        rsi = self.pta.rsi(close=close_values, length=window)
         return rsi
 
     def ema(self, close_values: pd.Series, window: int) -> pd.Series:
-        ema = pta.ema(close=close_values, length=window)
+        if self.backend == "numpy":
+            return self._to_series(
+                kernels.ema(close_values, window), close_values, f"EMA_{window}"
+            )
+        ema = self.pta.ema(close=close_values, length=window)
         return ema
 
+    def sma(self, close_values: pd.Series, window: int) -> pd.Series:
+        if self.backend == "numpy":
+            return self._to_series(
+                kernels.sma(close_values, window), close_values, f"SMA_{window}"
+            )
+        sma = self.pta.sma(close=close_values, length=window)
+        return sma
+
+    def rsi_frame(self, close: pd.DataFrame, window: int = 14) -> pd.DataFrame:
+        """
+        RSI of every column of a (time x ticker) close matrix in one pass.
+        Same values as 'rsi()' on each column with its missing bars dropped.
+        """
+        # Change from the previous available close, so gaps in a column don't break its series.
+        diff = (close - close.ffill().shift(1)).where(close.notna())
+        positive = diff.clip(lower=0)
+        negative = diff.clip(upper=0).abs()
+        positive_avg = self._rma(positive, window)
+        negative_avg = self._rma(negative, window)
+        rsi = 100 * positive_avg / (positive_avg + negative_avg)
+        return rsi.where(close.notna())
+
+    def ema_frame(self, close: pd.DataFrame, window: int) -> pd.DataFrame:
+        """
+        EMA of every column of a (time x ticker) close matrix in one pass, seeded with the SMA
+        of the first 'window' rows like 'ema()'.
+        """
+        if len(close) < window:
+            return pd.DataFrame(np.nan, index=close.index, columns=close.columns)
+        seeded = close.copy()
+        seeded.iloc[window - 1] = close.iloc[:window].sum() / window
+        seeded.iloc[: window - 1] = np.nan
+        return seeded.ewm(span=window, adjust=False).mean()
+
+    def _rma(self, values: pd.DataFrame, window: int) -> pd.DataFrame:
+        return values.ewm(alpha=1 / window, min_periods=window, ignore_na=True).mean()
+
     def vwap(
         self,
         high: pd.Series,
@@ -22,7 +87,18 @@ class TechnicalAnalysis:
         close: pd.Series,
         volume_share_qty: pd.Series,
     ):
+        if self.backend == "numpy":
+            # Restarted every day (pandas_ta's default anchor), in the timezone of the index.
+            index = volume_share_qty.index.tz_localize(None)
+            days = index.to_numpy().astype("datetime64[D]")
+            values = kernels.vwap(high, low, close, volume_share_qty, groups=days)
+            return self._to_series(values, volume_share_qty, "VWAP_D")
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", UserWarning)
-            vwap = pta.vwap(high=high, low=low, close=close, volume=volume_share_qty)
+            vwap = self.pta.vwap(
+                high=high, low=low, close=close, volume=volume_share_qty
+            )
         return vwap
+
+    def _to_series(self, values: np.ndarray, like: pd.Series, name: str) -> pd.Series:
+        return pd.Series(values, index=like.index, name=name)
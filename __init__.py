@@ -16,8 +16,8 @@ from Options.option_utils import OptionScalping
 
 # Look at this for dex prices: https://coinsbench.com/using-web3-python-to-get-latest-price-of-smart-contract-token-92aafcb2bde7
 
-candle_storage = "./LocalStorage/Candles"
-
+# Candle cache used by every 'CandleStore'.
+from LocalStorage.candle_store import candle_storage
 
 if __name__ == "__main__":
     # s = StockCharts()
@@ -0,0 +1,59 @@
+import ccxt
+
+# Custom
+from Crypto.CEX.cex import CentralizedExchange
+from LocalStorage.candle_store import CandleStore
+
+BAR_MS = 60_000
+
+
+class FakeExchange:
+    rateLimit = 1
+
+    def __init__(self) -> None:
+        self.calls = []
+        # Half way through a bar, like a real clock.
+        self.now = 1_700_000_000_000 // BAR_MS * BAR_MS + BAR_MS // 2
+
+    def parse_timeframe(self, timeframe: str) -> int:
+        return BAR_MS // 1000
+
+    def milliseconds(self) -> int:
+        return self.now
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.calls.append((since, limit))
+        last = self.now // BAR_MS * BAR_MS
+        start = last - (limit - 1) * BAR_MS if since is None else since
+        bars = range(start, last + 1, BAR_MS)
+        return [[t, 1.0, 2.0, 0.5, 1.5, 10.0] for t in bars][:limit]
+
+
+def get_exchange(tmp_path, monkeypatch) -> CentralizedExchange:
+    monkeypatch.setattr(ccxt, "fakex", FakeExchange, raising=False)
+    cex = CentralizedExchange("fakex")
+    cex.candle_store = CandleStore(root=str(tmp_path), source="fakex")
+    return cex
+
+
+def test_larger_limit_after_short_tail(tmp_path, monkeypatch):
+    cex = get_exchange(tmp_path, monkeypatch)
+    assert len(cex._fetch_ohlcv("BTC/USDT", "1m", 10)) == 10
+
+    # The stored tail doesn't reach back to the start of the larger window, so the whole window is fetched.
+    ohlcv = cex._fetch_ohlcv("BTC/USDT", "1m", 500)
+    assert len(ohlcv) == 500
+    assert cex.exchange.calls[-1] == (None, 500)
+    timestamps = [bar[0] for bar in ohlcv]
+    assert timestamps == list(range(timestamps[0], timestamps[-1] + 1, BAR_MS))
+
+
+def test_covered_window_only_fetches_new_bars(tmp_path, monkeypatch):
+    cex = get_exchange(tmp_path, monkeypatch)
+    ohlcv = cex._fetch_ohlcv("BTC/USDT", "1m", 500)
+    cex.exchange.now += 3 * BAR_MS
+
+    latest = cex._fetch_ohlcv("BTC/USDT", "1m", 500)
+    assert cex.exchange.calls[-1][0] == ohlcv[-1][0]
+    assert len(latest) == 500
+    assert latest[-1][0] == ohlcv[-1][0] + 3 * BAR_MS
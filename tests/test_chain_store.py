@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+# Custom
+from Options.chain_store import ChainSnapshotStore
+
+
+def get_chain(volume) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "contractSymbol": ["AAPL261023C00100000", "AAPL261023C00105000"],
+            "strike": [100.0, 105.0],
+            "volume": volume,
+        }
+    )
+
+
+def test_int_and_float_volume_snapshots(tmp_path):
+    store = ChainSnapshotStore(root=str(tmp_path))
+    store.append(get_chain([10, 20]), "AAPL", "2026-10-16 10:00")
+    store.append(get_chain([np.nan, 5.0]), "AAPL", "2026-10-16 10:05")
+
+    chain = store.load("AAPL")
+    assert len(chain) == 4
+    assert chain["volume"].dtype == np.float64
+    assert store.get_snapshots("AAPL")["contracts"].tolist() == [2, 2]
+    latest = store.load("AAPL", latest=True)
+    assert latest["volume"].isna().sum() == 1